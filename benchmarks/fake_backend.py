@@ -0,0 +1,197 @@
+"""Backend factice (/detect et /test_all) pour benchmarks et tests.
+
+Latence et taille des réponses suivent des distributions configurables ;
+le serveur compte les requêtes et les octets reçus.
+
+Usage autonome : python -m benchmarks.fake_backend --port 8000 --latency-ms 80
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CATEGORIES = ('plastic', 'paper', 'metal', 'glass', 'organic')
+
+
+class FakeBackend:
+    """Serveur HTTP local dans un thread, à utiliser comme contexte.
+
+    - `latency_ms` / `latency_sigma` : latence log-normale (médiane, dispersion)
+    - `description_bytes` : taille du texte `description` renvoyé
+    - `boxes` : nombre de boîtes de détection renvoyées par image
+    - `error_rate` : proportion de réponses 503
+    - `test_all_records` : nombre d'enregistrements streamés par /test_all
+    """
+
+    def __init__(self, port=0, latency_ms=50.0, latency_sigma=0.3, description_bytes=120,
+                 boxes=0, error_rate=0.0, test_all_records=1000, seed=0):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.description_bytes = description_bytes
+        self.boxes = boxes
+        self.error_rate = error_rate
+        self.test_all_records = test_all_records
+        self.requests = 0
+        self.bytes_received = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_uri(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name='fake-backend')
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_received = 0
+            self.max_in_flight = 0
+
+    def _latency(self):
+        with self._lock:
+            return self.latency_ms / 1000 * math.exp(self._random.gauss(0, self.latency_sigma))
+
+    def detection(self):
+        with self._lock:
+            category = self._random.choice(CATEGORIES)
+            confidence = round(self._random.uniform(0.5, 1.0), 4)
+            fail = self._random.random() < self.error_rate
+            boxes = [[round(self._random.uniform(0, 0.8), 3), round(self._random.uniform(0, 0.8), 3)]
+                     for _ in range(self.boxes)]
+        result = {
+            'category': category,
+            'confidence': confidence,
+            'description': ('x' * self.description_bytes),
+            'recycling_tips': f'Déposer dans le bac {category}.',
+        }
+        if boxes:
+            result['detections'] = [
+                {'box': [x, y, round(x + 0.15, 3), round(y + 0.15, 3)],
+                 'label': self._random.choice(CATEGORIES), 'score': 0.9}
+                for x, y in boxes
+            ]
+        return (None if fail else result), fail
+
+    def test_all_record(self, index):
+        expected = CATEGORIES[index % len(CATEGORIES)]
+        with self._lock:
+            predicted = expected if self._random.random() < 0.8 else self._random.choice(CATEGORIES)
+            confidence = round(self._random.uniform(0.3, 1.0), 4)
+        return {'image': f'{index}.jpg', 'true_label': expected,
+                'predicted': predicted, 'confidence': confidence}
+
+    def _handler_class(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                # Corps lu par morceaux et jeté : le faux backend ne garde rien en mémoire
+                remaining = length
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 65536))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                with backend._lock:
+                    backend.requests += 1
+                    backend.bytes_received += length
+                    backend.in_flight += 1
+                    backend.max_in_flight = max(backend.max_in_flight, backend.in_flight)
+                try:
+                    time.sleep(backend._latency())
+                    result, fail = backend.detection()
+                    if fail:
+                        self._send_json(503, {'detail': 'indisponible'})
+                    else:
+                        self._send_json(200, result)
+                finally:
+                    with backend._lock:
+                        backend.in_flight -= 1
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('test_all'):
+                    self._stream_test_all()
+                else:
+                    self._send_json(200, {'status': 'ok'})
+
+            def _stream_test_all(self):
+                total = backend.test_all_records
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.send_header('X-Total-Count', str(total))
+                self.end_headers()
+                lines = []
+                for index in range(total):
+                    lines.append(json.dumps(backend.test_all_record(index)))
+                    if len(lines) == 100 or index == total - 1:
+                        chunk = ('\n'.join(lines) + '\n').encode()
+                        self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                        lines = []
+                self.wfile.write(b'0\r\n\r\n')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--latency-sigma', type=float, default=0.3)
+    parser.add_argument('--description-bytes', type=int, default=120)
+    parser.add_argument('--boxes', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--test-all-records', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    backend = FakeBackend(port=args.port, latency_ms=args.latency_ms,
+                          latency_sigma=args.latency_sigma,
+                          description_bytes=args.description_bytes, boxes=args.boxes,
+                          error_rate=args.error_rate, test_all_records=args.test_all_records)
+    print(f"Backend factice sur {backend.base_uri} (Ctrl+C pour arrêter)")
+    try:
+        backend._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
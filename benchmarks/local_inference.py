@@ -0,0 +1,104 @@
+"""Modèle local contre backend distant sur le jeu test_all : latence et exactitude.
+
+Le jeu est un dossier d'images rangées par catégorie attendue
+(`<dataset>/<catégorie>/*.jpg`), le même que celui évalué par `/test_all`.
+Chaque image est classée par le backend (`--api-uri`, sans cache) et par le
+modèle local (`--model`, défaut LOCAL_MODEL_PATH) ; on rapporte pour chacun
+les percentiles de latence, le débit séquentiel et l'exactitude, ainsi que
+le taux d'accord entre les deux.
+
+Usage : python -m benchmarks.local_inference --dataset data/test --model model.onnx
+        --api-uri http://localhost:8000/
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.run import percentiles
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def load_dataset(directory, limit=None):
+    """Liste de (catégorie attendue, octets de l'image)"""
+    samples = []
+    for label in sorted(os.listdir(directory)):
+        label_dir = os.path.join(directory, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(label_dir, name), 'rb') as f:
+                    samples.append((label, f.read()))
+    return samples[:limit] if limit else samples
+
+
+def evaluate(name, classify, samples):
+    """Classe chaque image avec `classify` et retourne (métriques, prédictions)"""
+    latencies, predictions, errors = [], [], 0
+    start = time.perf_counter()
+    for _, image_bytes in samples:
+        call_start = time.perf_counter()
+        try:
+            predictions.append(classify(image_bytes).get('category'))
+        except Exception as exc:
+            errors += 1
+            predictions.append(None)
+            print(f"{name}: échec ({exc})", file=sys.stderr)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    correct = sum(1 for (label, _), predicted in zip(samples, predictions)
+                  if predicted is not None and predicted.lower() == label.lower())
+    metrics = percentiles(latencies)
+    metrics['images_per_s'] = len(samples) / elapsed
+    metrics['accuracy'] = correct / len(samples)
+    metrics['errors'] = errors
+    return metrics, predictions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', required=True, help="Dossier <catégorie>/<image>")
+    parser.add_argument('--model', default=os.environ.get('LOCAL_MODEL_PATH', ''))
+    parser.add_argument('--api-uri', default='', help="Backend à comparer ; omis : modèle local seul")
+    parser.add_argument('--limit', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+
+    from wastewise.local_model import load_model
+
+    if not args.model:
+        parser.error("--model ou LOCAL_MODEL_PATH requis")
+    samples = load_dataset(args.dataset, args.limit)
+    if not samples:
+        parser.error(f"aucune image dans {args.dataset}")
+
+    model = load_model(args.model)
+    model.predict(samples[0][1])  # échauffement (allocation des tenseurs)
+    results = {'local': evaluate('local', model.predict, samples)}
+
+    if args.api_uri:
+        from wastewise.api import post_image
+
+        api_url = args.api_uri.rstrip('/') + '/detect'
+        post_image(samples[0][1], api_url)
+        results['remote'] = evaluate('remote', lambda image: post_image(image, api_url), samples)
+
+    print(f"{len(samples)} images, modèle {args.model}")
+    print(f"{'chemin':<8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'img/s':>10}{'exactitude':>12}{'erreurs':>9}")
+    for name, (metrics, _) in results.items():
+        print(f"{name:<8}{metrics['p50_ms']:>10.1f}{metrics['p95_ms']:>10.1f}{metrics['p99_ms']:>10.1f}"
+              f"{metrics['images_per_s']:>10.1f}{metrics['accuracy']:>12.1%}{metrics['errors']:>9}")
+    if 'remote' in results:
+        pairs = list(zip(results['local'][1], results['remote'][1]))
+        agree = sum(1 for local, remote in pairs if local is not None and local == remote)
+        print(f"Accord local/distant : {agree / len(pairs):.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Code exécuté par rerun, page par page : modules de pages importés et appels.
+
+Chaque page est mesurée dans un processus neuf, ouvert sur `?page=<page>` :
+- modules `wastewise.views.*` importés (seul celui de la page doit l'être,
+  avec `shared`) ;
+- appels de fonctions Python par rerun, répartis entre app.py et les
+  modules de pages (profilage `sys.setprofile` du thread de script) ;
+- durée médiane d'un rerun.
+
+Usage : python -m benchmarks.pages [--reruns N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, 'app.py')
+VIEWS_DIR = os.path.join(ROOT_DIR, 'wastewise', 'views')
+
+_MEASURE = """
+import json, os, statistics, sys, tempfile, threading, time
+from collections import Counter
+
+os.environ.setdefault('PREDICTION_LOG_PATH', os.path.join(tempfile.mkdtemp(), 'predictions.sqlite3'))
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+set_log_level('error')
+watched = {{{app_path!r}: 'app.py'}}
+calls = Counter()
+
+def profile(frame, event, arg):
+    if event == 'call':
+        filename = frame.f_code.co_filename
+        label = watched.get(filename)
+        if label is None and filename.startswith({views_dir!r}):
+            label = 'views/' + os.path.basename(filename)
+        if label is not None:
+            calls[label] += 1
+
+at = AppTest.from_file({app_path!r}, default_timeout=60)
+at.secrets['cloud_api_uri'] = 'http://127.0.0.1:9/'
+at.query_params['page'] = {page!r}
+at.run()
+assert not at.exception, at.exception
+
+durations = []
+threading.setprofile(profile)
+sys.setprofile(profile)
+for _ in range({reruns}):
+    start = time.perf_counter()
+    at.run()
+    durations.append(time.perf_counter() - start)
+sys.setprofile(None)
+threading.setprofile(None)
+
+print(json.dumps({{
+    'modules': sorted(name for name in sys.modules if name.startswith('wastewise.views.')),
+    'calls': {{label: count / {reruns} for label, count in calls.items()}},
+    'rerun_ms': statistics.median(durations) * 1000,
+}}))
+"""
+
+
+def measure(page, reruns):
+    from wastewise.views import PAGES  # noqa: F401 (vérifie que la page existe)
+
+    code = _MEASURE.format(app_path=APP_PATH, views_dir=VIEWS_DIR, page=page, reruns=reruns)
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True,
+                          text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from wastewise.views import PAGES
+
+    for page in PAGES:
+        result = measure(page, args.reruns)
+        modules = ', '.join(name.rsplit('.', 1)[1] for name in result['modules'])
+        print(f"{page:<10} rerun {result['rerun_ms']:6.1f} ms   modules de pages : {modules}")
+        for label, count in sorted(result['calls'].items()):
+            print(f"{'':<10} {label:<22}{count:>8.0f} appels/rerun")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Journal SQLite des prédictions : coût d'ajout et temps de page sur des millions de lignes.
+
+Remplit une base temporaire de `--rows` prédictions puis mesure :
+- le coût d'un `append` côté thread de script et le débit du writer ;
+- la première page, une page profonde (pagination par clé) et une page
+  filtrée par catégorie, comparées à la même page profonde par OFFSET ;
+- la liste des catégories (parcours d'index par sauts).
+
+Usage : python -m benchmarks.prediction_log [--rows 2000000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from wastewise.prediction_log import COLUMNS, INSERT, PredictionLog, categories, connect, page
+
+CATEGORIES = ('plastic', 'paper', 'glass', 'metal', 'cardboard', 'organic', 'trash')
+
+
+def fill(path, rows, chunk=100_000):
+    rng = random.Random(0)
+    start_ts = time.time() - rows
+    connection = connect(path)
+    for offset in range(0, rows, chunk):
+        batch = [(start_ts + offset + i, rng.choice(CATEGORIES), rng.random(), 'backend', 'upload',
+                  f'{rng.getrandbits(256):064x}', 'default')
+                 for i in range(min(chunk, rows - offset))]
+        with connection:
+            connection.executemany(INSERT, batch)
+    connection.close()
+
+
+def timed(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'predictions.sqlite3')
+
+        log = PredictionLog(path, batch_size=500, flush_interval=0.5, max_queue=1_000_000)
+        record = (time.time(), 'plastic', 0.9, 'backend', 'upload', '0' * 64, 'default')
+        n = 100_000
+        start = time.perf_counter()
+        for _ in range(n):
+            log.append(record)
+        append_us = (time.perf_counter() - start) / n * 1e6
+        log.close(timeout=60)
+        writer_rps = n / (time.perf_counter() - start)
+        print(f"append (thread de script) : {append_us:.1f} µs ; writer : {writer_rps:,.0f} lignes/s")
+
+        start = time.perf_counter()
+        fill(path, args.rows)
+        print(f"{args.rows:,} lignes insérées en {time.perf_counter() - start:.1f}s")
+
+        connection = sqlite3.connect(path)
+        depth = args.rows * 9 // 10
+        cursor = connection.execute(
+            f"SELECT ts, id FROM predictions ORDER BY ts DESC, id DESC LIMIT 1 OFFSET {depth}").fetchone()
+        offset_query = (f"SELECT id, {', '.join(COLUMNS)} FROM predictions "
+                        f"ORDER BY ts DESC, id DESC LIMIT {args.page_size} OFFSET {depth}")
+
+        results = {
+            'première page': timed(lambda: page(path, limit=args.page_size)),
+            f'page à {depth:,} (clé)': timed(lambda: page(path, before=cursor, limit=args.page_size)),
+            f'page à {depth:,} (OFFSET)': timed(lambda: connection.execute(offset_query).fetchall(), repeat=3),
+            'catégorie, page profonde (clé)': timed(
+                lambda: page(path, before=cursor, category='glass', limit=args.page_size)),
+            'liste des catégories': timed(lambda: categories(path)),
+        }
+        connection.close()
+        for name, ms in results.items():
+            print(f"{name:<34}{ms:>10.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
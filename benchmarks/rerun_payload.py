@@ -0,0 +1,42 @@
+"""Mesure des octets de Markdown/HTML émis par rerun, page par page.
+
+Usage : python -m benchmarks.rerun_payload
+"""
+import os
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+PAGES = ('detection', 'upload', 'history', 'about')
+
+
+def markdown_bytes(at):
+    """Total des octets des éléments Markdown d'un run (CSS incluse)"""
+    return sum(len(m.value.encode()) for m in at.markdown)
+
+
+def style_bytes(at):
+    """Octets des éléments qui injectent la feuille de style"""
+    return sum(len(m.value.encode()) for m in at.markdown
+               if '<style>' in m.value or 'rel="stylesheet"' in m.value)
+
+
+def measure(page):
+    at = AppTest.from_file(APP_PATH, default_timeout=30)
+    at.secrets['cloud_api_uri'] = 'http://127.0.0.1:9/'
+    at.session_state['current_page'] = page
+    at.run()
+    # Deuxième run : ce que coûte chaque interaction
+    at.run()
+    return markdown_bytes(at), style_bytes(at)
+
+
+def main():
+    print(f"{'page':<12}{'markdown/rerun':>16}{'dont CSS':>12}")
+    for page in PAGES:
+        total, style = measure(page)
+        print(f"{page:<12}{total:>14} o{style:>10} o")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""Suite de benchmarks contre le backend factice, avec contrôle de régression.
+
+Scénarios :
+- predict     : appels concurrents à detect() (débit, percentiles, octets envoyés)
+- upload      : import + « Analyser » sur la page upload via AppTest, jusqu'au
+                résultat ; submit_p50_ms = durée du rerun qui soumet l'analyse
+- detection   : photo + « Analyser » sur la page détection via AppTest
+- rerun       : rerun à vide de chaque page avec un résultat affiché
+- test_all    : run test_all complet en streaming via AppTest
+- overlay     : boîtes et étiquettes de OVERLAY_BOXES détections, dessinées
+                seules sur l'aperçu (draw_ms) et avec décodage / encodage
+                JPEG d'une photo (render_ms)
+
+Les résultats sont comparés à benchmarks/baselines.json (une section par
+mode, `full` ou `quick`) : toute métrique dégradée de plus de la tolérance
+(TOLERANCE, plus large en mode rapide où les percentiles portent sur peu
+d'échantillons) fait échouer le run (code retour 1). Indépendamment des baselines, la
+latence de predict doit rester sous SANITY_P50_FACTOR fois la latence
+médiane du backend factice : un run aberrant échoue et n'est jamais
+enregistré comme baseline.
+
+Usage : python -m benchmarks.run [--quick] [--update-baselines] [--tolerance 0.3]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_backend import FakeBackend
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, 'app.py')
+BASELINES_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'baselines.json')
+
+# Sens d'amélioration de chaque métrique
+HIGHER_IS_BETTER = {'throughput_rps', 'records_per_s'}
+PHOTO_SEEDS = {'upload': 1000, 'detection': 2000}
+# Latence médiane du backend factice (ms) et borne absolue de predict.p50_ms
+# (prétraitement client et file du limiteur compris)
+BACKEND_LATENCY_MS = 40
+SANITY_P50_FACTOR = 6
+OVERLAY_BOXES = 50
+# Dégradation relative tolérée par mode
+TOLERANCE = {'full': 0.3, 'quick': 0.5}
+# Mesures CPU courtes (rerun, overlay) : autant d'itérations dans les deux
+# modes, leur médiane sur 3 mesures variait de 30 % d'un run à l'autre
+CPU_ITERATIONS = 10
+
+
+def make_photo(seed, size=(1600, 1200)):
+    """Image JPEG de taille « téléphone », différente pour chaque graine"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    h, w = size[1], size[0]
+    # Grands aplats aléatoires (structure propre à chaque graine) + grain fin
+    blocks = rng.uniform(0, 255, (6, 8, 3)).repeat(h // 6, 0).repeat(w // 8, 1)
+    grain = rng.normal(0, 12, (h // 4, w // 4, 1)).repeat(4, 0).repeat(4, 1)
+    pixels = np.clip(blocks + grain, 0, 255).astype(np.uint8)
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format='JPEG', quality=92)
+    return output.getvalue()
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)]  # noqa: E731
+    return {'p50_ms': pick(0.5) * 1000, 'p95_ms': pick(0.95) * 1000, 'p99_ms': pick(0.99) * 1000}
+
+
+def new_app(backend, page):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets['cloud_api_uri'] = backend.base_uri
+    at.session_state['current_page'] = page
+    return at
+
+
+def click(at, label_prefix):
+    [button for button in at.button if button.label.startswith(label_prefix)][0].click()
+
+
+# --------------------------------------------------------
+# Scénarios
+# --------------------------------------------------------
+def bench_predict(backend, requests, concurrency):
+    from wastewise.api import detect
+
+    photo = make_photo(0)
+    api_url = backend.base_uri + 'detect'
+    # Échauffement : session HTTP, imports différés
+    detect(photo + b'warmup', api_url)
+    backend.reset_counters()
+
+    def one(i):
+        # Octets ajoutés après la fin du JPEG : image identique, clé de cache différente
+        start = time.perf_counter()
+        detect(photo + i.to_bytes(4, 'big'), api_url)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        'throughput_rps': requests / elapsed,
+        **percentiles(latencies),
+        'bytes_sent_per_request': backend.bytes_received / max(backend.requests, 1),
+    }
+
+
+def bench_page_interaction(backend, page, iterations):
+    backend.reset_counters()
+    at = new_app(backend, page)
+    at.run()
+    durations, submits = [], []
+    for i in range(iterations):
+        # Images distinctes par page : ni le cache ni le dHash ne doivent répondre
+        photo = make_photo(PHOTO_SEEDS[page] + i)
+        if page == 'upload':
+            at.file_uploader[0].set_value(('photo.jpg', photo, 'image/jpeg'))
+        else:
+            at.camera_input[0].set_value(('photo.jpg', photo, 'image/jpeg'))
+        at.run()
+        click(at, '🔍 Analyser')
+        start = time.perf_counter()
+        at.run()
+        submits.append(time.perf_counter() - start)
+        # Analyse en arrière-plan : reruns jusqu'à l'affichage du résultat
+        while 'pending_prediction' in at.session_state:
+            time.sleep(0.005)
+            at.run()
+        durations.append(time.perf_counter() - start)
+        assert not at.exception, at.exception
+        assert at.session_state['prediction_result'], at.error
+    return {
+        **percentiles(durations),
+        'submit_p50_ms': statistics.median(submits) * 1000,
+        'bytes_sent_per_request': backend.bytes_received / max(backend.requests, 1),
+    }
+
+
+def bench_rerun(backend, page, reruns):
+    at = new_app(backend, page)
+    at.session_state['prediction_result'] = {'category': 'plastic', 'confidence': 0.9}
+    at.run()
+    durations = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        durations.append(time.perf_counter() - start)
+    return {'p50_ms': statistics.median(durations) * 1000}
+
+
+def bench_test_all(backend):
+    at = new_app(backend, 'upload')
+    at.run()
+    click(at, '🚀 Lancer test_all')
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    assert not at.exception, at.exception
+    return {'records_per_s': backend.test_all_records / elapsed}
+
+
+def bench_overlay(iterations):
+    import numpy as np
+
+    from wastewise.overlay import draw_detections, render_overlay
+
+    # Dessin seul, sur un aperçu 640x480
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    corners = rng.uniform(0, 0.85, (OVERLAY_BOXES, 2)) * (640, 480)
+    boxes = np.concatenate([corners, corners + (96, 72)], axis=1)
+    labels = ['plastic', 'paper', 'glass', 'metal', 'cardboard'] * (OVERLAY_BOXES // 5)
+    scores = rng.uniform(0.3, 1.0, OVERLAY_BOXES)
+    # Premier appel hors mesure : police et glyphes
+    draw_detections(pixels, boxes, labels, scores)
+    draws = []
+    for _ in range(iterations * 5):
+        start = time.perf_counter()
+        draw_detections(pixels, boxes, labels, scores)
+        draws.append(time.perf_counter() - start)
+
+    # Aperçu complet d'une photo (appel direct, hors cache)
+    photo = make_photo(3000)
+    with FakeBackend(boxes=OVERLAY_BOXES) as backend:
+        detections = backend.detection()[0]['detections']
+    renders = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render_overlay(photo, detections, 640)
+        renders.append(time.perf_counter() - start)
+    return {'draw_p50_ms': statistics.median(draws) * 1000, 'render_p50_ms': statistics.median(renders) * 1000}
+
+
+def run_suite(quick=False):
+    iterations = 3 if quick else 10
+    cpu_iterations = max(iterations, CPU_ITERATIONS)
+    results = {}
+    with FakeBackend(latency_ms=BACKEND_LATENCY_MS, latency_sigma=0.3,
+                     test_all_records=2000 if quick else 20000) as backend:
+        for name, metrics in (
+            ('predict', bench_predict(backend, 20 if quick else 100, concurrency=8)),
+            ('upload', bench_page_interaction(backend, 'upload', iterations)),
+            ('detection', bench_page_interaction(backend, 'detection', iterations)),
+            ('rerun.detection', bench_rerun(backend, 'detection', cpu_iterations)),
+            ('rerun.upload', bench_rerun(backend, 'upload', cpu_iterations)),
+            ('rerun.about', bench_rerun(backend, 'about', cpu_iterations)),
+            ('test_all', bench_test_all(backend)),
+            ('overlay', bench_overlay(cpu_iterations)),
+        ):
+            for metric, value in metrics.items():
+                results[f'{name}.{metric}'] = round(value, 2)
+    return results
+
+
+# --------------------------------------------------------
+# Baselines
+# --------------------------------------------------------
+def compare(results, baselines, tolerance):
+    """Retourne la liste des régressions (métrique, baseline, valeur)"""
+    regressions = []
+    for metric, baseline in baselines.items():
+        value = results.get(metric)
+        if value is None:
+            continue
+        if metric.rsplit('.', 1)[-1] in HIGHER_IS_BETTER:
+            regressed = value < baseline * (1 - tolerance)
+        else:
+            regressed = value > baseline * (1 + tolerance)
+        if regressed:
+            regressions.append((metric, baseline, value))
+    return regressions
+
+
+def check_sanity(results):
+    """Métriques hors des bornes absolues : (métrique, borne, valeur)"""
+    bound = SANITY_P50_FACTOR * BACKEND_LATENCY_MS
+    value = results.get('predict.p50_ms')
+    return [('predict.p50_ms', bound, value)] if value is not None and value > bound else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="moins d'itérations")
+    parser.add_argument('--update-baselines', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="dégradation relative tolérée (défaut 0.3 = 30%%, 0.5 en mode rapide)")
+    args = parser.parse_args(argv)
+    mode = 'quick' if args.quick else 'full'
+    tolerance = TOLERANCE[mode] if args.tolerance is None else args.tolerance
+
+    from streamlit.logger import set_log_level
+
+    set_log_level('error')
+    logging.getLogger('wastewise').setLevel(logging.WARNING)
+    # Journal des prédictions dans un fichier jetable (coût d'écriture inclus)
+    os.environ.setdefault('PREDICTION_LOG_PATH',
+                          os.path.join(tempfile.mkdtemp(prefix='wastewise-bench-'), 'predictions.sqlite3'))
+
+    results = run_suite(quick=args.quick)
+    all_baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH, encoding='utf-8') as f:
+            all_baselines = json.load(f)
+    baselines = all_baselines.get(mode, {})
+
+    print(f"{'métrique':<40}{'valeur':>12}{'baseline':>12}")
+    for metric, value in results.items():
+        baseline = baselines.get(metric, '–')
+        print(f"{metric:<40}{value:>12}{baseline:>12}")
+
+    insane = check_sanity(results)
+    for metric, bound, value in insane:
+        print(f"ABERRANT {metric}: {value} (borne {bound}, {SANITY_P50_FACTOR} x la latence du backend)")
+    if insane:
+        return 1
+
+    if args.update_baselines:
+        all_baselines[mode] = results
+        with open(BASELINES_PATH, 'w', encoding='utf-8') as f:
+            json.dump(all_baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaselines mises à jour : {BASELINES_PATH}")
+        return 0
+
+    regressions = compare(results, baselines, tolerance)
+    for metric, baseline, value in regressions:
+        print(f"RÉGRESSION {metric}: {value} (baseline {baseline}, tolérance {tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
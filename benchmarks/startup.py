@@ -0,0 +1,95 @@
+"""Temps de démarrage et de rerun de l'app, avec détail des imports.
+
+Le détail des imports reprend la sortie de `python -X importtime` : un
+processus de référence n'importe que le harnais Streamlit, un second
+exécute en plus un premier run de l'app ; la différence est le coût
+d'import propre à l'app, regroupé par package.
+
+Usage : python -m benchmarks.startup [--reruns N] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, 'app.py')
+PAGES = ('detection', 'upload', 'history', 'about')
+
+_HARNESS = "from streamlit.testing.v1 import AppTest"
+_RUN_APP = f"""
+at = AppTest.from_file({APP_PATH!r}, default_timeout=60)
+at.secrets['cloud_api_uri'] = 'http://127.0.0.1:9/'
+at.run()
+"""
+
+
+def importtime(code):
+    """Exécute `code` sous -X importtime ; retourne {module: (self_us, cumul_us)}"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def import_breakdown():
+    """Coût d'import propre à l'app (µs de temps propre), par package racine"""
+    baseline = importtime(_HARNESS)
+    app = importtime(_HARNESS + _RUN_APP)
+    by_package = Counter()
+    for name, (self_us, _) in app.items():
+        if name not in baseline:
+            by_package[name.split('.')[0]] += self_us
+    return by_package
+
+
+def rerun_times(page, reruns):
+    """Durée du premier run puis des reruns suivants (secondes)"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.secrets['cloud_api_uri'] = 'http://127.0.0.1:9/'
+    at.session_state['current_page'] = page
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+
+    durations = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        durations.append(time.perf_counter() - start)
+    return first, durations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=20)
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args(argv)
+
+    by_package = import_breakdown()
+    print("Imports propres à l'app (self, ms)")
+    for package, self_us in by_package.most_common(args.top):
+        print(f"  {package:<28}{self_us / 1000:>8.1f}")
+    print(f"  {'TOTAL':<28}{sum(by_package.values()) / 1000:>8.1f}")
+
+    print(f"\n{'page':<12}{'1er run (ms)':>14}{'rerun p50 (ms)':>16}{'rerun max (ms)':>16}")
+    for page in PAGES:
+        first, durations = rerun_times(page, args.reruns)
+        print(f"{page:<12}{first * 1000:>14.1f}{statistics.median(durations) * 1000:>16.1f}"
+              f"{max(durations) * 1000:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""Fixtures partagées des tests.
+
+Lancer depuis la racine du dépôt : python -m pytest tests
+"""
+import io
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def make_jpeg():
+    """Fabrique d'images JPEG de bruit, différentes pour chaque graine"""
+    def make(seed, width=160, height=120):
+        import numpy as np
+        from PIL import Image
+
+        pixels = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+        output = io.BytesIO()
+        Image.fromarray(pixels).save(output, format='JPEG', quality=90)
+        return output.getvalue()
+
+    return make
@@ -0,0 +1,18 @@
+"""Mode lot : un lot interrompu libère le pool partagé."""
+import time
+
+from benchmarks.fake_backend import FakeBackend
+from wastewise import config
+from wastewise.batch import run_batch
+
+IMAGES = 40
+
+
+def test_closing_the_batch_cancels_images_not_started(make_jpeg):
+    images = [(f'{seed}.jpg', make_jpeg(seed)) for seed in range(500, 500 + IMAGES)]
+    with FakeBackend(latency_ms=50, latency_sigma=0) as backend:
+        outcomes = run_batch(images, backend.base_uri + 'detect')
+        next(outcomes)
+        outcomes.close()
+        time.sleep(0.3)
+        assert backend.requests <= 3 * config.BATCH_WORKERS
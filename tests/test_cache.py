@@ -0,0 +1,37 @@
+"""Niveau disque du cache des prédictions : borné comme le niveau mémoire."""
+import os
+import time
+
+from wastewise.cache import PredictionCache
+
+DISK_SIZE = 20
+
+
+def disk_files(cache):
+    return sorted(name for name in os.listdir(cache.disk_dir) if name.endswith('.json'))
+
+
+def test_disk_tier_keeps_the_most_recent_entries(tmp_path):
+    cache = PredictionCache(max_entries=4, ttl=3600, disk_dir=str(tmp_path), disk_max_entries=DISK_SIZE)
+    for index in range(100):
+        cache.put(f'{index:03d}', {'category': 'glass'})
+        # Dates d'écriture distinctes, quelle que soit la résolution du système de fichiers
+        os.utime(cache._path(f'{index:03d}'), (index, 1e9 + index))
+    files = disk_files(cache)
+    assert len(files) <= DISK_SIZE
+    assert '099.json' in files and '000.json' not in files
+    assert cache.stats()['disk_entries'] == len(files)
+
+
+def test_sweep_removes_expired_entries_first(tmp_path):
+    cache = PredictionCache(max_entries=4, ttl=60, disk_dir=str(tmp_path), disk_max_entries=DISK_SIZE)
+    for index in range(DISK_SIZE):
+        cache.put(f'old{index}', {'category': 'paper'})
+        os.utime(cache._path(f'old{index}'), (0, time.time() - 120))
+    cache.put('fresh', {'category': 'metal'})
+    assert disk_files(cache) == ['fresh.json']
+
+    # Relu depuis le disque par un autre process
+    reopened = PredictionCache(max_entries=4, ttl=60, disk_dir=str(tmp_path), disk_max_entries=DISK_SIZE)
+    assert reopened.get('fresh') == {'category': 'metal'}
+    assert reopened.stats()['disk_entries'] == 1
@@ -0,0 +1,82 @@
+"""Limiteur adaptatif : gigue ordinaire contre surcharge réelle."""
+import math
+import random
+
+import pytest
+import requests
+
+from wastewise.limiter import AdaptiveLimiter
+
+INITIAL_LIMIT = 8
+
+
+def new_limiter():
+    return AdaptiveLimiter(initial_limit=INITIAL_LIMIT, min_limit=1, max_limit=64, max_queue=32,
+                           queue_timeout=1.0, latency_tolerance=2.0, backoff_ratio=0.9)
+
+
+def feed(limiter, latencies, ok=True):
+    """Réponses à limite pleine : toutes les places sont prises avant chaque réponse"""
+    for latency in latencies:
+        while limiter.stats()['in_flight'] < limiter.limit:
+            limiter.acquire()
+        limiter.release(latency, ok)
+
+
+def jittery(count, median=0.040, sigma=0.3, seed=0):
+    """Latences log-normales d'un backend sain (même loi que le backend factice)"""
+    rng = random.Random(seed)
+    return [median * math.exp(rng.gauss(0, sigma)) for _ in range(count)]
+
+
+def test_jitter_of_a_healthy_backend_does_not_lower_the_limit():
+    limiter = new_limiter()
+    feed(limiter, jittery(2000))
+    assert limiter.limit >= INITIAL_LIMIT
+
+
+def test_sustained_latency_increase_lowers_the_limit():
+    limiter = new_limiter()
+    feed(limiter, jittery(500))
+    feed(limiter, [latency * 4 for latency in jittery(50, seed=1)])
+    assert limiter.limit < INITIAL_LIMIT
+
+
+def test_errors_lower_the_limit():
+    limiter = new_limiter()
+    feed(limiter, jittery(100))
+    feed(limiter, [0.040] * 10, ok=False)
+    assert limiter.limit < INITIAL_LIMIT
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+def fail_in_slot(limiter, error, count):
+    """Réponses à limite pleine qui lèvent `error` dans slot()"""
+    for _ in range(count):
+        while limiter.stats()['in_flight'] < limiter.limit - 1:
+            limiter.acquire()
+        with pytest.raises(type(error)):
+            with limiter.slot():
+                raise error
+        while limiter.stats()['in_flight']:
+            limiter.release(0.040, True)
+
+
+def test_client_errors_do_not_lower_the_limit():
+    limiter = new_limiter()
+    feed(limiter, jittery(100))
+    fail_in_slot(limiter, http_error(400), 10)
+    assert limiter.limit >= INITIAL_LIMIT
+
+
+@pytest.mark.parametrize('error', [http_error(503), requests.ConnectionError("down"), requests.Timeout("slow")])
+def test_backend_failures_in_a_slot_lower_the_limit(error):
+    limiter = new_limiter()
+    feed(limiter, jittery(100))
+    fail_in_slot(limiter, error, 10)
+    assert limiter.limit < INITIAL_LIMIT
@@ -0,0 +1,42 @@
+"""Modèle local inutilisable en mode fallback : le backend répond seul."""
+import logging
+
+import pytest
+
+from benchmarks.fake_backend import FakeBackend
+from wastewise import config
+from wastewise.api import detect
+from wastewise.local_model import get_local_model
+
+
+@pytest.fixture
+def fallback_model(monkeypatch, tmp_path):
+    """Mode fallback sur un chemin de modèle à définir par le test"""
+    monkeypatch.setattr(config, 'INFERENCE_MODE', 'fallback')
+    get_local_model.clear()
+    yield lambda path: monkeypatch.setattr(config, 'LOCAL_MODEL_PATH', str(path))
+    get_local_model.clear()
+
+
+@pytest.mark.parametrize('seed, name, content', [
+    (300, 'model.pt', b'\x00' * 16),        # extension non supportée
+    (310, 'missing.onnx', None),            # fichier absent
+    (320, 'corrupt.onnx', b'not a model'),  # modèle illisible (ou runtime absent)
+])
+def test_unusable_local_model_leaves_the_backend_in_charge(fallback_model, make_jpeg, tmp_path,
+                                                           caplog, seed, name, content):
+    path = tmp_path / name
+    if content is not None:
+        path.write_bytes(content)
+    fallback_model(path)
+
+    with caplog.at_level(logging.WARNING, logger='wastewise.local_model'):
+        with FakeBackend(latency_ms=1, latency_sigma=0) as backend:
+            # Images distinctes : aucune réponse ne vient du cache des prédictions
+            for offset in range(3):
+                assert detect(make_jpeg(seed=seed + offset), backend.base_uri + 'detect')['category']
+
+    assert backend.requests == 3
+    assert get_local_model() is None
+    # Chargement tenté une seule fois pour le process
+    assert len([r for r in caplog.records if 'Inférence locale désactivée' in r.getMessage()]) == 1
@@ -0,0 +1,44 @@
+"""Export Prometheus : un port indisponible ne casse pas l'app."""
+import logging
+import socket
+
+import pytest
+import requests
+
+from wastewise import config
+from wastewise.metrics import start_exporters
+
+
+@pytest.fixture
+def exporter_config(monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_BIND', '127.0.0.1')
+    monkeypatch.setattr(config, 'METRICS_FILE', '')
+    start_exporters.clear()
+    yield monkeypatch
+    server = start_exporters()
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    start_exporters.clear()
+
+
+def test_endpoint_listens_on_the_configured_address(exporter_config):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    exporter_config.setattr(config, 'METRICS_PORT', port)
+    server = start_exporters()
+    assert server.server_address == ('127.0.0.1', port)
+    response = requests.get(f'http://127.0.0.1:{port}/metrics', timeout=5)
+    assert response.status_code == 200
+
+
+def test_port_already_in_use_is_logged_not_raised(exporter_config, caplog):
+    with socket.socket() as taken:
+        taken.bind(('127.0.0.1', 0))
+        taken.listen()
+        exporter_config.setattr(config, 'METRICS_PORT', taken.getsockname()[1])
+        with caplog.at_level(logging.ERROR, logger='wastewise.metrics'):
+            assert start_exporters() is None
+            assert start_exporters() is None
+    assert len([r for r in caplog.records if '/metrics' in r.getMessage()]) == 1
@@ -0,0 +1,38 @@
+"""Détections du backend : boîtes validées une à une, jamais d'exception pour l'aperçu."""
+import numpy as np
+import pytest
+
+from wastewise.overlay import detection_boxes, overlay
+
+SIZE = (400, 200)
+SENT_EDGE = 800
+
+
+def test_malformed_detections_are_skipped():
+    detections = [
+        {'box': [0.1, 0.1, 0.5, 0.5], 'label': 'glass', 'score': None},
+        {'box': [0.1, 0.1, 0.5], 'label': 'paper'},
+        {'box': None, 'label': 'metal'},
+        {'box': [0.1, 'x', 0.5, 0.5], 'label': 'metal'},
+        {'box': [0.1, 0.1, float('nan'), 0.5], 'label': 'metal'},
+        {'box': [0.1, 0.1, 0.5, 0.5], 'label': 'paper', 'score': 'high'},
+        'plastic',
+    ]
+    boxes, labels, scores = detection_boxes(detections, SIZE, SENT_EDGE, min_score=0.0)
+    assert labels == ['glass'] and scores == [1.0]
+    np.testing.assert_allclose(boxes, [[40, 20, 200, 100]])
+
+
+def test_normalized_or_pixel_is_decided_per_box():
+    detections = [
+        {'box': [0.5, 0.5, 1.02, 1.0], 'label': 'glass', 'score': 0.9},
+        {'box': [80, 40, 400, 200], 'label': 'paper', 'score': 0.8},
+    ]
+    boxes, labels, _ = detection_boxes(detections, SIZE, SENT_EDGE, min_score=0.0)
+    assert labels == ['glass', 'paper']
+    np.testing.assert_allclose(boxes, [[200, 100, 408, 200], [40, 20, 200, 100]])
+
+
+@pytest.mark.parametrize('detections', [{'box': [0, 0, 1, 1]}, 'none', [None, {'score': None}]])
+def test_unusable_detections_fall_back_to_the_plain_preview(make_jpeg, detections):
+    assert overlay(make_jpeg(600), {'category': 'glass', 'detections': detections}) is None
@@ -0,0 +1,18 @@
+"""Dédoublonnage dHash : réutilisation limitée au même modèle et aux images quasi identiques."""
+from wastewise.phash import RecentHashIndex, dhash
+
+
+def test_prediction_is_reused_only_for_the_same_model(make_jpeg):
+    index = RecentHashIndex(size=4, threshold=2)
+    image_hash = dhash(make_jpeg(400))
+    index.add(image_hash, 'remote:v1', {'label': 'glass'})
+    assert index.lookup(image_hash, 'remote:v1') == {'label': 'glass'}
+    assert index.lookup(image_hash, 'remote:v2') is None
+    assert index.lookup(image_hash, 'local:model.onnx') is None
+    assert index.stats() == {'skipped': 1}
+
+
+def test_different_images_are_not_reused(make_jpeg):
+    index = RecentHashIndex(size=4, threshold=2)
+    index.add(dhash(make_jpeg(400)), 'remote:v1', {'label': 'glass'})
+    assert index.lookup(dhash(make_jpeg(401)), 'remote:v1') is None
@@ -0,0 +1,128 @@
+"""Routage entre backends : bascule, disjoncteur, couverture."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from wastewise.limiter import AdaptiveLimiter, BackendOverloaded
+from wastewise.router import Backend, BackendRouter
+
+FAILURES = 3
+COOLDOWN = 0.2
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        yield executor
+
+
+def new_router(executor, names=('a', 'b', 'c'), hedge_delay=0.0):
+    backends = [Backend(name, f'http://{name}/',
+                        limiter=AdaptiveLimiter(8, 1, 64, 32, 1.0, 2.0, 0.9))
+                for name in names]
+    return BackendRouter(backends, alpha=0.3, hedge_delay=hedge_delay, failures=FAILURES,
+                         cooldown=COOLDOWN, executor=executor)
+
+
+def states(router):
+    return [backend['state'] for backend in router.stats()]
+
+
+def answer(behaviours):
+    """`send` qui applique le comportement prévu pour chaque backend (nom -> exception, durée ou None)"""
+    calls = []
+
+    def send(backend):
+        calls.append(backend.name)
+        behaviour = behaviours.get(backend.name)
+        if isinstance(behaviour, Exception):
+            raise behaviour
+        if behaviour:
+            time.sleep(behaviour)
+        return backend.name
+
+    send.calls = calls
+    return send
+
+
+def open_breaker(router, name):
+    send = answer({name: requests.ConnectionError("down")})
+    for _ in range(FAILURES):
+        with pytest.raises(requests.ConnectionError):
+            router._run(next(b for b in router.backends if b.name == name), send)
+
+
+@pytest.mark.parametrize('hedge_delay', [0.0, 0.5])
+def test_backend_failure_fails_over_to_the_next_backend(executor, hedge_delay):
+    router = new_router(executor, hedge_delay=hedge_delay)
+    send = answer({'a': requests.ConnectionError("down")})
+    assert router.call(send) in ('b', 'c')
+    assert send.calls[0] == 'a'
+    assert router.stats()[0]['errors'] == 1
+
+
+@pytest.mark.parametrize('hedge_delay', [0.0, 0.5])
+def test_local_rejection_fails_over_without_touching_the_breaker(executor, hedge_delay):
+    router = new_router(executor, hedge_delay=hedge_delay)
+    open_breaker(router, 'a')
+    time.sleep(COOLDOWN)
+    assert states(router) == ['half_open', 'closed', 'closed']
+
+    send = answer({'a': BackendOverloaded("file pleine")})
+    assert router.call(send) in ('b', 'c')
+    assert send.calls[0] == 'a'
+    # L'essai n'a pas atteint le backend : toujours en demi-ouverture, essai libéré
+    assert states(router) == ['half_open', 'closed', 'closed']
+    assert router.pick() is router.backends[0]
+
+
+def test_local_rejection_everywhere_raises(executor):
+    router = new_router(executor, hedge_delay=0.5)
+    send = answer({name: BackendOverloaded("file pleine") for name in 'abc'})
+    with pytest.raises(BackendOverloaded):
+        router.call(send)
+    assert sorted(send.calls) == ['a', 'b', 'c']
+    assert all(backend['errors'] == 0 for backend in router.stats())
+
+
+def test_breaker_opens_then_probe_decides(executor):
+    router = new_router(executor)
+    open_breaker(router, 'a')
+    assert states(router) == ['open', 'closed', 'closed']
+    assert router.pick().name != 'a'
+
+    # Essai raté : le backend repart pour une période de retrait
+    time.sleep(COOLDOWN)
+    probe_fails = answer({'a': requests.ConnectionError("still down")})
+    with pytest.raises(requests.ConnectionError):
+        router._run(router.pick(), probe_fails)
+    assert states(router) == ['open', 'closed', 'closed']
+
+    # Essai réussi : réintégré
+    time.sleep(COOLDOWN)
+    probe = router.pick()
+    assert probe.name == 'a'
+    assert router.pick() is not probe  # un seul essai à la fois
+    assert router._run(probe, answer({})) == 'a'
+    assert states(router) == ['closed', 'closed', 'closed']
+
+
+def test_client_error_does_not_open_the_breaker(executor):
+    router = new_router(executor)
+    response = requests.Response()
+    response.status_code = 400
+    send = answer({'a': requests.HTTPError("bad request", response=response)})
+    for _ in range(FAILURES + 1):
+        with pytest.raises(requests.HTTPError):
+            router.call(send)
+    assert states(router)[0] == 'closed'
+
+
+def test_slow_primary_is_hedged(executor):
+    router = new_router(executor, names=('a', 'b'), hedge_delay=0.05)
+    assert router.call(answer({'a': 0.5})) == 'b'
+    stats = {backend['backend']: backend for backend in router.stats()}
+    assert stats['b']['hedges'] == 1
+    assert stats['b']['hedge_wins'] == 1
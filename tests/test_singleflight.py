@@ -0,0 +1,84 @@
+"""Regroupement des appels simultanés pour une même image."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fake_backend import FakeBackend
+from wastewise.api import detect
+from wastewise.singleflight import SingleFlight, get_single_flight
+
+SESSIONS = 8
+
+
+def run_concurrently(fn, count):
+    """Lance `fn` dans `count` threads libérés en même temps ; résultats ou exceptions"""
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        try:
+            return fn()
+        except Exception as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(lambda _: call(), range(count)))
+
+
+def test_identical_images_share_one_backend_call(make_jpeg):
+    image_bytes = make_jpeg(seed=100)
+    before = get_single_flight().stats()['coalesced']
+
+    # Latence backend bien plus longue que le démarrage des threads
+    with FakeBackend(latency_ms=300, latency_sigma=0) as backend:
+        results = run_concurrently(lambda: detect(image_bytes, backend.base_uri + 'detect'), SESSIONS)
+
+    assert backend.requests == 1
+    assert all(result == results[0] for result in results)
+    assert get_single_flight().stats()['coalesced'] - before == SESSIONS - 1
+    assert get_single_flight().stats()['in_flight'] == 0
+
+
+def test_different_images_are_not_coalesced(make_jpeg):
+    images = [make_jpeg(seed=200 + i) for i in range(3)]
+    with FakeBackend(latency_ms=100, latency_sigma=0) as backend:
+        counter = iter(range(len(images)))
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                image_bytes = images[next(counter)]
+            return detect(image_bytes, backend.base_uri + 'detect')
+
+        run_concurrently(call, len(images))
+
+    assert backend.requests == len(images)
+
+
+def test_followers_receive_the_leader_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise RuntimeError("backend en panne")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, 'key', failing)
+        started.wait(5)
+        followers = [executor.submit(flight.do, 'key', failing) for _ in range(3)]
+        # Les suivants sont enregistrés avant la fin du premier appel
+        while flight.stats()['coalesced'] < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        for future in [leader, *followers]:
+            with pytest.raises(RuntimeError, match="backend en panne"):
+                future.result()
+
+    assert len(calls) == 1
+    assert flight.stats() == {'calls': 1, 'coalesced': 3, 'in_flight': 0}
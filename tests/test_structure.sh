@@ -32,5 +32,11 @@ if [[ $(cat requirements.txt) =~ "\nscikit" ]]; then
   ((errors++));
 fi
 
+for weight in Light Regular Medium SemiBold Bold; do
+  if [[ ! -s static/fonts/Poppins-$weight.ttf ]]; then
+    echo -e "\e[0;33mWARNING: \e[0mstatic/fonts/Poppins-$weight.ttf is missing, run 'make vendor_fonts' and commit the fonts\e[0m";
+    ((warnings++));
+  fi
+done
 
 echo -e "Found \e[0;31m${errors} errors\e[0m and \e[0;33m${warnings} warnings\e[0m. Please solve these.\e[0m";
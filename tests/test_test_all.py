@@ -0,0 +1,51 @@
+"""Décodage en streaming des réponses JSON de test_all, quel que soit le découpage."""
+import json
+
+import pytest
+
+from wastewise.test_all import TestAllTotals, _iter_json_array
+
+RECORDS = [
+    {'true_label': 'glass', 'predicted': 'glass', 'confidence': 0.91, 'path': 'verre/é[1].jpg'},
+    {'true_label': 'paper', 'predicted': 'plastic', 'confidence': 0.55, 'note': 'a "quoted" ] bracket'},
+    {'true_label': 'metal', 'predicted': 'metal', 'confidence': 1},
+]
+
+BODIES = {
+    'bare array': json.dumps(RECORDS),
+    'bracket in a string': json.dumps({'run': 'v[1]', 'results': RECORDS}),
+    'array before the results': json.dumps({'classes': ['a', 'b'], 'results': RECORDS}),
+    'escaped quotes and numbers': ('{"note": "say \\"[x]\\" \\\\", "total": 12345, "nested": {"results": [1]},'
+                                   ' "results": ' + json.dumps(RECORDS) + ', "elapsed": 1.5}'),
+    'non-object elements': json.dumps({'results': [RECORDS[0], 3, 'x', [4], RECORDS[1], None, RECORDS[2]]}),
+    'compact': json.dumps({'classes': ['a'], 'results': RECORDS}, separators=(',', ':')),
+}
+
+
+class ChunkedResponse:
+    def __init__(self, body, size):
+        self.body = body.encode('utf-8')
+        self.size = size
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), self.size):
+            yield self.body[start:start + self.size]
+
+
+@pytest.mark.parametrize('name', BODIES)
+def test_records_are_decoded_at_every_chunk_size(name):
+    body = BODIES[name]
+    for size in range(1, len(body.encode('utf-8')) + 1):
+        assert list(_iter_json_array(ChunkedResponse(body, size))) == RECORDS, size
+
+
+def test_documents_without_records_yield_nothing():
+    for body in ('{"classes": ["a", "b"], "total": 0}', '{"results": 5}', '"[1, 2]"', '{}'):
+        assert list(_iter_json_array(ChunkedResponse(body, 3))) == []
+
+
+def test_totals_accept_every_decoded_record():
+    totals = TestAllTotals()
+    for record in _iter_json_array(ChunkedResponse(BODIES['array before the results'], 7)):
+        totals.add(record)
+    assert (totals.count, totals.labelled, totals.correct) == (3, 3, 2)
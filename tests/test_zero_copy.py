@@ -0,0 +1,82 @@
+"""Mémoire d'une analyse : du buffer de l'UploadedFile au corps multipart."""
+import io
+import tracemalloc
+
+import pytest
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+from urllib3.filepost import encode_multipart_formdata
+
+from benchmarks.fake_backend import FakeBackend
+from wastewise import config
+from wastewise.api import detect
+from wastewise.buffers import BufferReader, MultipartBody, open_buffer
+from wastewise.preprocess import prepare_image
+from wastewise.thumbnails import thumbnail
+
+
+@pytest.fixture(scope='module')
+def backend(make_jpeg):
+    with FakeBackend(latency_ms=1, latency_sigma=0) as fake:
+        # Échauffement : imports différés, session HTTP, pools
+        detect(make_jpeg(seed=0, width=64, height=48), fake.base_uri + 'detect')
+        yield fake
+
+
+def analysis_peak(backend, image_bytes):
+    """Pic de mémoire Python d'une analyse (aperçu + detect), en octets"""
+    upload = UploadedFile(UploadedFileRec('id', 'photo.jpg', 'image/jpeg', image_bytes), None)
+    backend.reset_counters()
+    tracemalloc.start()
+    try:
+        data = upload.getvalue()
+        thumbnail(data)
+        detect(data, backend.base_uri + 'detect')
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('max_edge, max_ratio', [(224, 0.25), (4000, 1.5)])
+def test_analysis_peak_close_to_image_size(backend, make_jpeg, monkeypatch, max_edge, max_ratio):
+    # max_edge=4000 : pas de réduction, l'image ré-encodée fait la taille de l'originale
+    monkeypatch.setattr(config, 'IMAGE_MAX_EDGE', max_edge)
+    image_bytes = make_jpeg(seed=max_edge, width=2000, height=1500)
+
+    peak = analysis_peak(backend, image_bytes)
+
+    assert backend.requests == 1
+    assert peak < max_ratio * len(image_bytes)
+
+
+def test_getvalue_shares_uploaded_bytes(make_jpeg):
+    image_bytes = make_jpeg(seed=1, width=64, height=48)
+    upload = UploadedFile(UploadedFileRec('id', 'photo.jpg', 'image/jpeg', image_bytes), None)
+    assert upload.getvalue() is image_bytes
+
+
+def test_multipart_body_matches_urllib3_encoding(make_jpeg):
+    data, mime_type = prepare_image(make_jpeg(seed=2, width=640, height=480))
+    body = MultipartBody('file', 'image.jpeg', data, mime_type)
+
+    expected, content_type = encode_multipart_formdata(
+        {'file': ('image.jpeg', b''.join(data.chunks), mime_type)}, boundary=body.boundary)
+
+    assert len(body) == len(expected)
+    assert body.content_type == content_type
+    chunks = iter(lambda: body.read(1000), b'')
+    assert b''.join(chunks) == expected
+    # Rejouable pour les réessais
+    body.seek(0)
+    assert body.read(len(expected) + 10) == expected
+
+
+def test_open_buffer_reads_memoryview_without_copy():
+    payload = bytearray(b'0123456789')
+    reader = open_buffer(memoryview(payload))
+    assert isinstance(reader, BufferReader)
+    assert reader.read(4) == b'0123'
+    reader.seek(-2, io.SEEK_END)
+    assert reader.read() == b'89'
+    payload[8:] = b'xy'
+    reader.seek(8)
+    assert reader.read() == b'xy'
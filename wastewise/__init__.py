@@ -0,0 +1 @@
+"""Briques internes du front-end WasteWise (client API, cache, métriques...)."""
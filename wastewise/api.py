@@ -0,0 +1,143 @@
+"""Appels au backend de classification."""
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.buffers import MultipartBody
+from wastewise.cache import get_prediction_cache, image_key
+from wastewise.client import HTTP_TIMEOUT, get_http_session, track_phases
+from wastewise.limiter import get_limiter
+from wastewise.local_model import get_local_model
+from wastewise.metrics import get_metrics
+from wastewise.phash import dhash
+from wastewise.preprocess import prepare_image
+from wastewise.router import get_router
+from wastewise.singleflight import get_single_flight
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def get_base_uri():
+    """URI du backend, choisie par la variable API_URI (clé de st.secrets)"""
+    base_uri = st.secrets[os.environ.get('API_URI', 'cloud_api_uri')]
+    return base_uri if base_uri.endswith('/') else base_uri + '/'
+
+
+def backend_label(api_url):
+    """Étiquette de métrique d'un backend : schéma://hôte:port"""
+    parts = urlsplit(api_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def record_backend_timings(api_url, phases, total):
+    metrics = get_metrics()
+    backend = backend_label(api_url)
+    for phase, seconds in phases.items():
+        metrics.observe('wastewise_backend_phase_seconds', seconds, backend=backend, phase=phase)
+    metrics.observe('wastewise_backend_request_seconds', total, backend=backend)
+
+
+def send_image(data, mime_type, api_url, limiter=None):
+    """Envoie une image déjà prétraitée au backend à travers le limiteur"""
+    timeout = HTTP_TIMEOUT
+    if config.INFERENCE_MODE == 'fallback' and get_local_model() is not None:
+        timeout = (HTTP_TIMEOUT[0], min(HTTP_TIMEOUT[1], config.FALLBACK_READ_TIMEOUT))
+
+    # Corps multipart lu en flux depuis `data`, sans assemblage en mémoire
+    body = MultipartBody("file", "image." + mime_type.split('/')[1], data, mime_type)
+    start = time.perf_counter()
+    with track_phases() as phases, (limiter or get_limiter()).slot():
+        response = get_http_session().post(
+            api_url,
+            data=body,
+            headers={"Content-Type": body.content_type},
+            timeout=timeout
+        )
+        response.raise_for_status()
+    parse_start = time.perf_counter()
+    result = response.json()
+    phases['parse'] = time.perf_counter() - parse_start
+    record_backend_timings(api_url, phases, time.perf_counter() - start)
+    return result
+
+
+def post_image(image_bytes, api_url):
+    """Prétraite l'image et l'envoie au backend.
+
+    Si ROUTING_BACKENDS est défini, `api_url` est ignorée : le routeur
+    choisit le backend et la requête part vers son `detect`, à travers le
+    limiteur propre à ce backend.
+    """
+    data, mime_type = prepare_image(image_bytes)
+    router = get_router()
+    if router is None:
+        return send_image(data, mime_type, api_url)
+    return router.call(lambda backend: send_image(data, mime_type, backend.base_uri + 'detect',
+                                                  backend.limiter))
+
+
+def local_model_or_raise():
+    model = get_local_model()
+    if model is None:
+        raise RuntimeError("Modèle local indisponible (LOCAL_MODEL_PATH et runtime ONNX/TFLite)")
+    return model
+
+
+def detect(image_bytes, api_url, hash_index=None):
+    """Classifie une image via le backend et retourne le dict résultat.
+
+    Passe par le cache des prédictions puis, en cas d'absence, prétraite
+    l'image et l'envoie à `api_url` à travers le limiteur de concurrence.
+    Avec `hash_index` (index dHash de la session, voir
+    `session_hash_index`), une image quasi identique à une image récente
+    prédite par le même modèle réutilise sa prédiction au lieu d'appeler le
+    backend. Selon `INFERENCE_MODE`, le modèle local remplace le backend
+    (`local`) ou prend le relais quand il échoue (`fallback`, résultat non
+    mis en cache).
+    Les appels simultanés pour une même image (même clé de cache) attendent
+    le premier au lieu d'appeler eux aussi le backend.
+    Lève une exception en cas d'échec, ce qui permet de l'appeler hors du
+    thread de script Streamlit.
+    """
+    cache = get_prediction_cache()
+    local_mode = config.INFERENCE_MODE == 'local'
+    model_version = 'local:' + os.path.basename(config.LOCAL_MODEL_PATH) if local_mode else config.MODEL_VERSION
+    key = image_key(image_bytes, model_version)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    image_hash = None
+    scope = f'{config.INFERENCE_MODE}:{model_version}'
+    if hash_index is not None:
+        image_hash = dhash(image_bytes)
+        result = hash_index.lookup(image_hash, scope)
+        if result is not None:
+            return result
+
+    def compute():
+        if local_mode:
+            result = local_model_or_raise().predict(image_bytes)
+        else:
+            try:
+                result = post_image(image_bytes, api_url)
+            except Exception as exc:
+                model = get_local_model() if config.INFERENCE_MODE == 'fallback' else None
+                if model is None:
+                    raise
+                logger.warning("Backend en échec (%s), repli sur le modèle local", exc)
+                model.record_fallback()
+                return model.predict(image_bytes)
+
+        cache.put(key, result)
+        if image_hash is not None:
+            hash_index.add(image_hash, scope, result)
+        return result
+
+    # Même image demandée par plusieurs sessions en même temps : un seul appel
+    return get_single_flight().do(key, compute)
@@ -0,0 +1,47 @@
+"""Construction de la feuille de style statique (minifiée, nommée par empreinte)."""
+import glob
+import hashlib
+import os
+import re
+
+import streamlit as st
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STYLES_SOURCE = os.path.join(ROOT_DIR, 'wastewise', 'assets', 'styles.css')
+# Dossier servi par Streamlit sous `app/static/` (server.enableStaticServing)
+STATIC_DIR = os.path.join(ROOT_DIR, 'static')
+STATIC_URL = 'app/static/'
+
+
+def minify_css(css):
+    """Supprime commentaires et espaces superflus"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+@st.cache_resource
+def build_stylesheet():
+    """Écrit `static/wastewise.<empreinte>.min.css` et retourne son URL.
+
+    Le nom change avec le contenu : le navigateur peut garder le fichier
+    en cache sans jamais servir une version périmée.
+    """
+    with open(STYLES_SOURCE, encoding='utf-8') as f:
+        css = minify_css(f.read())
+    digest = hashlib.sha256(css.encode()).hexdigest()[:12]
+    filename = f'wastewise.{digest}.min.css'
+    path = os.path.join(STATIC_DIR, filename)
+
+    if not os.path.exists(path):
+        for stale in glob.glob(os.path.join(STATIC_DIR, 'wastewise.*.min.css')):
+            os.remove(stale)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(css)
+    return STATIC_URL + filename
+
+
+def stylesheet_tag():
+    """Balise <link> vers la feuille de style (quelques dizaines d'octets par rerun)"""
+    return f'<link rel="stylesheet" href="{build_stylesheet()}">'
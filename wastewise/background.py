@@ -0,0 +1,54 @@
+"""Prédiction interactive exécutée hors du thread de script Streamlit."""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.batch import timed_detect
+
+
+@st.cache_resource
+def get_prediction_executor():
+    """Pool des analyses interactives, distinct du mode lot pour ne pas attendre derrière un lot"""
+    return ThreadPoolExecutor(max_workers=config.PREDICTION_WORKERS,
+                              thread_name_prefix='wastewise-predict')
+
+
+class BackgroundPrediction:
+    """Analyse d'une image soumise au pool partagé et suivie par sa session.
+
+    Le thread de script ne fait que soumettre puis consulter le future : la
+    session reste interactive pendant l'appel au backend. Le résultat est
+    enregistré (historique, journal) par le script lorsqu'il le récupère.
+    """
+
+    def __init__(self, image_bytes, api_url, hash_index=None, origin='upload'):
+        self.image_bytes = image_bytes
+        self.origin = origin
+        self.submitted_at = time.monotonic()
+        self._future = get_prediction_executor().submit(timed_detect, image_bytes, api_url, hash_index)
+
+    @property
+    def done(self):
+        return self._future.done()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.submitted_at
+
+    def wait(self, timeout):
+        """Attend la fin de l'analyse au plus `timeout` secondes"""
+        wait([self._future], timeout)
+
+    def outcome(self):
+        """(résultat, erreur, latence) ; à n'appeler qu'une fois `done`"""
+        return self._future.result()
+
+    def cancel(self):
+        """Annule l'analyse si elle attend encore un worker.
+
+        Un appel déjà en cours n'est pas interrompu ; son résultat est
+        simplement ignoré puisque la session ne garde plus ce future.
+        """
+        return self._future.cancel()
@@ -0,0 +1,45 @@
+"""Analyse d'un lot d'images via un pool de workers partagé."""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.api import detect
+
+
+@st.cache_resource
+def get_batch_executor():
+    """Pool unique pour le process : borne la concurrence toutes sessions confondues"""
+    return ThreadPoolExecutor(max_workers=config.BATCH_WORKERS,
+                              thread_name_prefix='wastewise-batch')
+
+
+def timed_detect(image_bytes, api_url, hash_index=None):
+    """Appelle detect() et retourne (résultat, erreur, latence en secondes)"""
+    start = time.perf_counter()
+    try:
+        return detect(image_bytes, api_url, hash_index), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+def run_batch(images, api_url):
+    """Soumet les images au pool et les rend au fil de l'eau.
+
+    `images` est une liste de tuples (nom, octets). Génère des tuples
+    (index, résultat, erreur, latence en secondes) dans l'ordre de fin.
+    Fermer le générateur (run du script interrompu) annule les images qui
+    n'ont pas encore démarré : le pool partagé ne travaille plus pour rien.
+    """
+    executor = get_batch_executor()
+    futures = {
+        executor.submit(timed_detect, image_bytes, api_url): index
+        for index, (_, image_bytes) in enumerate(images)
+    }
+    try:
+        for future in as_completed(futures):
+            yield (futures[future], *future.result())
+    finally:
+        for future in futures:
+            future.cancel()
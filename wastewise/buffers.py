@@ -0,0 +1,144 @@
+"""Lecture des images sans copie intermédiaire du contenu complet.
+
+`UploadedFile.getvalue()` partage l'objet bytes reçu par Streamlit (le
+`BytesIO` n'est pas encore modifié) ; `getbuffer()` forcerait au contraire
+une copie. Les fonctions ci-dessous acceptent indifféremment bytes et
+memoryview et ne copient que les morceaux demandés par le lecteur.
+"""
+import io
+import os
+import uuid
+
+
+class BufferReader(io.RawIOBase):
+    """Fichier en lecture seule sur un buffer existant (bytes, memoryview...)"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def __len__(self):
+        return len(self._view)
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._pos + size)
+        chunk = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return chunk
+
+    def readinto(self, target):
+        chunk = self._view[self._pos:self._pos + len(target)]
+        target[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+
+def open_buffer(data):
+    """Objet fichier sur `data` sans le copier"""
+    # BytesIO(bytes) partage l'objet tant qu'on n'écrit pas ; BytesIO(memoryview) copierait
+    return io.BytesIO(data) if isinstance(data, bytes) else BufferReader(data)
+
+
+class ChunkWriter(io.RawIOBase):
+    """Destination d'écriture qui garde les morceaux tels quels.
+
+    Contrairement à BytesIO, pas de réallocation du buffer à mesure qu'il
+    grandit ni de copie finale : les morceaux produits par l'encodeur sont
+    conservés et relus en flux par MultipartBody.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self._size += len(chunk)
+        return len(chunk)
+
+    def tell(self):
+        return self._size
+
+    def __len__(self):
+        return self._size
+
+
+class MultipartBody(io.RawIOBase):
+    """Corps multipart/form-data d'un seul fichier, lu en flux.
+
+    Les en-têtes de la partie et la frontière finale sont de petits bytes ;
+    le contenu du fichier (un buffer ou un ChunkWriter) est lu directement
+    dans ses buffers. `__len__` permet à requests d'envoyer un
+    Content-Length (pas de chunked) et `seek` de rejouer le corps lors
+    d'un réessai.
+    """
+
+    def __init__(self, field, filename, data, content_type):
+        self.boundary = uuid.uuid4().hex
+        head = (f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n').encode()
+        tail = f'\r\n--{self.boundary}--\r\n'.encode()
+        chunks = data.chunks if isinstance(data, ChunkWriter) else [data]
+        self._parts = [memoryview(head)] + [memoryview(chunk).cast('B') for chunk in chunks] + [memoryview(tail)]
+        self._size = sum(len(part) for part in self._parts)
+        self._pos = 0
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def __len__(self):
+        return self._size
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, target):
+        target = memoryview(target).cast('B')
+        written = 0
+        start = 0
+        for part in self._parts:
+            end = start + len(part)
+            if self._pos < end and written < len(target):
+                chunk = part[self._pos - start:self._pos - start + len(target) - written]
+                target[written:written + len(chunk)] = chunk
+                written += len(chunk)
+                self._pos += len(chunk)
+            start = end
+        return written
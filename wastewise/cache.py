@@ -0,0 +1,186 @@
+"""Cache des prédictions, adressé par le contenu de l'image."""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from wastewise import config
+
+# Un balayage du disque redescend à cette fraction de la capacité : pas de
+# balayage à chaque écriture une fois le cache plein
+DISK_SWEEP_RATIO = 0.9
+
+
+def image_key(image_bytes, model_version=None):
+    """Clé de cache : empreinte de l'image + version du modèle.
+
+    Les réglages de prétraitement en font partie puisqu'ils changent ce
+    que le modèle reçoit réellement.
+    """
+    digest = hashlib.sha256(image_bytes)
+    digest.update(b'\0')
+    digest.update('|'.join(map(str, (
+        model_version or config.MODEL_VERSION,
+        config.IMAGE_MAX_EDGE,
+        config.IMAGE_FORMAT,
+        config.IMAGE_QUALITY,
+    ))).encode())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """LRU en mémoire bornée avec TTL, doublée d'un niveau disque optionnel"""
+
+    def __init__(self, max_entries, ttl, disk_dir=None, disk_max_entries=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir or None
+        self.disk_max_entries = disk_max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_entries = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_entries = len(self._disk_files())
+
+    def get(self, key):
+        """Retourne une copie du résultat en cache, ou None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(result)
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, *entry)
+        return dict(entry[1])
+
+    def put(self, key, result):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires_at, result)
+        self._write_disk(key, expires_at, result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'disk_entries': self._disk_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+            }
+
+    def _store(self, key, expires_at, result):
+        self._entries[key] = (expires_at, dict(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ----------------------------------------------------
+    # Niveau disque : un fichier JSON par clé, borné par
+    # disk_max_entries (expirés puis plus anciens supprimés)
+    # ----------------------------------------------------
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key + '.json')
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['expires_at'] <= now:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                return None
+            with self._disk_lock:
+                self._disk_entries -= 1
+            return None
+        return entry['expires_at'], entry['result']
+
+    def _write_disk(self, key, expires_at, result):
+        if not self.disk_dir:
+            return
+        # Écriture atomique : fichier temporaire puis renommage
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': expires_at, 'result': result}, f)
+            created = not os.path.exists(path)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._disk_lock:
+            self._disk_entries += created
+            if self.disk_max_entries and self._disk_entries > self.disk_max_entries:
+                self._sweep_disk()
+
+    def _disk_files(self):
+        """(date d'écriture, chemin) des fichiers du cache, du plus ancien au plus récent"""
+        files = []
+        with os.scandir(self.disk_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    files.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+        files.sort()
+        return files
+
+    def _sweep_disk(self):
+        """Supprime les fichiers expirés, puis les plus anciens jusqu'à DISK_SWEEP_RATIO de la capacité"""
+        files = self._disk_files()
+        keep = int(self.disk_max_entries * DISK_SWEEP_RATIO)
+        # TTL fixe : un fichier expire `ttl` secondes après son écriture
+        written_before = time.time() - self.ttl
+        removed = 0
+        for mtime, path in files:
+            if mtime > written_before and len(files) - removed <= keep:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            removed += 1
+        self._disk_entries = len(files) - removed
+
+
+@st.cache_resource
+def get_prediction_cache():
+    """Cache unique pour le process, partagé entre les sessions"""
+    return PredictionCache(
+        max_entries=config.PREDICTION_CACHE_SIZE,
+        ttl=config.PREDICTION_CACHE_TTL,
+        disk_dir=config.PREDICTION_CACHE_DIR,
+        disk_max_entries=config.PREDICTION_CACHE_DISK_SIZE,
+    )
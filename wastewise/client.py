@@ -0,0 +1,128 @@
+"""Client HTTP partagé par toutes les sessions Streamlit."""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from wastewise import config
+
+HTTP_TIMEOUT = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+
+# Codes renvoyés par un proxy / backend momentanément indisponible
+RETRY_STATUS_CODES = (502, 503, 504)
+
+# Durées des phases de la requête en cours, par thread
+_phases = threading.local()
+
+
+def _record_phase(phase, seconds):
+    timings = getattr(_phases, 'timings', None)
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def track_phases():
+    """Collecte les durées connect / send / ttfb des requêtes faites dans le bloc"""
+    _phases.timings = {}
+    try:
+        yield _phases.timings
+    finally:
+        _phases.timings = None
+
+
+@functools.lru_cache(maxsize=None)
+def _timed_adapter_class():
+    """HTTPAdapter dont les connexions chronomètrent chaque phase"""
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed(base):
+        class TimedConnection(base):
+            def connect(self):
+                start = time.perf_counter()
+                try:
+                    super().connect()
+                finally:
+                    self._connect_time = time.perf_counter() - start
+                    _record_phase('connect', self._connect_time)
+
+            def request(self, *args, **kwargs):
+                # Pour HTTP, la connexion est ouverte pendant l'envoi : on la retranche
+                self._connect_time = 0.0
+                start = time.perf_counter()
+                try:
+                    return super().request(*args, **kwargs)
+                finally:
+                    _record_phase('send', time.perf_counter() - start - self._connect_time)
+
+            def getresponse(self, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return super().getresponse(*args, **kwargs)
+                finally:
+                    _record_phase('ttfb', time.perf_counter() - start)
+
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    class TimedHTTPAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                'http': TimedHTTPConnectionPool,
+                'https': TimedHTTPSConnectionPool,
+            }
+
+    return TimedHTTPAdapter
+
+
+def build_http_session():
+    """Crée une session avec pool keep-alive et réessais"""
+    # Import différé : requests/urllib3 ne sont chargés qu'au premier appel
+    import requests
+    from urllib3.util.retry import Retry
+
+    # Les erreurs de connexion sont toujours réessayées (rien n'a été envoyé);
+    # les erreurs de lecture et les codes 5xx seulement sur les méthodes
+    # idempotentes (GET, HEAD, ...), jamais sur un POST déjà transmis.
+    retry = Retry(
+        total=config.HTTP_RETRIES,
+        connect=config.HTTP_RETRIES,
+        read=config.HTTP_RETRIES,
+        status=config.HTTP_RETRIES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    # Pool non bloquant : au-delà de HTTP_POOL_MAXSIZE, une connexion de plus
+    # est ouverte puis fermée après usage. La concurrence vers le backend est
+    # bornée par le limiteur (file et délai d'attente) ; une attente du pool,
+    # sans délai, s'y ajouterait et serait comptée comme latence du backend.
+    adapter = _timed_adapter_class()(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        pool_block=False,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers.update({'Connection': 'keep-alive'})
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+@st.cache_resource
+def get_http_session():
+    """Session unique pour le process, partagée entre les sessions utilisateur"""
+    return build_http_session()
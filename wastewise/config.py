@@ -0,0 +1,188 @@
+"""Paramètres d'exécution, lus depuis les variables d'environnement.
+
+Chaque cible `streamlit_*` du Makefile peut surcharger ces valeurs pour
+adapter le front-end à son environnement (local, docker, cloud).
+"""
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, '') else default
+
+
+# --------------------------------------------------------
+# CLIENT HTTP
+# --------------------------------------------------------
+# Nombre d'hôtes distincts gardés en cache et connexions keep-alive par hôte
+# (au-delà, les connexions supplémentaires sont fermées après usage)
+HTTP_POOL_CONNECTIONS = _env_int('HTTP_POOL_CONNECTIONS', 4)
+HTTP_POOL_MAXSIZE = _env_int('HTTP_POOL_MAXSIZE', 16)
+
+# Timeouts séparés (secondes) : établissement de connexion / lecture réponse
+HTTP_CONNECT_TIMEOUT = _env_float('HTTP_CONNECT_TIMEOUT', 3.05)
+HTTP_READ_TIMEOUT = _env_float('HTTP_READ_TIMEOUT', 30.0)
+
+# Réessais avec backoff exponentiel
+HTTP_RETRIES = _env_int('HTTP_RETRIES', 3)
+HTTP_BACKOFF_FACTOR = _env_float('HTTP_BACKOFF_FACTOR', 0.3)
+
+# --------------------------------------------------------
+# PRÉTRAITEMENT DES IMAGES
+# --------------------------------------------------------
+# Plus grand côté envoyé au backend (taille d'entrée du modèle)
+IMAGE_MAX_EDGE = _env_int('IMAGE_MAX_EDGE', 224)
+# Format de ré-encodage : JPEG ou WEBP
+IMAGE_FORMAT = os.environ.get('IMAGE_FORMAT', 'JPEG').upper()
+IMAGE_QUALITY = _env_int('IMAGE_QUALITY', 85)
+
+# --------------------------------------------------------
+# CACHE DES PRÉDICTIONS
+# --------------------------------------------------------
+# Version du modèle servi par le backend : la changer invalide le cache
+MODEL_VERSION = os.environ.get('MODEL_VERSION', 'default')
+PREDICTION_CACHE_SIZE = _env_int('PREDICTION_CACHE_SIZE', 512)
+PREDICTION_CACHE_TTL = _env_float('PREDICTION_CACHE_TTL', 3600.0)
+# Répertoire du niveau disque (désactivé si vide)
+PREDICTION_CACHE_DIR = os.environ.get('PREDICTION_CACHE_DIR', '')
+# Nombre max de fichiers du niveau disque (0 : illimité)
+PREDICTION_CACHE_DISK_SIZE = _env_int('PREDICTION_CACHE_DISK_SIZE', 10000)
+
+# --------------------------------------------------------
+# ANALYSE PAR LOT
+# --------------------------------------------------------
+# Requêtes simultanées vers le backend pour le mode lot (tout le process)
+BATCH_WORKERS = _env_int('BATCH_WORKERS', 4)
+
+# --------------------------------------------------------
+# ANALYSE EN ARRIÈRE-PLAN
+# --------------------------------------------------------
+# Analyses interactives en cours simultanément (tout le process)
+PREDICTION_WORKERS = _env_int('PREDICTION_WORKERS', 16)
+# Attente maximale entre deux rafraîchissements du panneau pendant une analyse (s)
+PREDICTION_POLL_INTERVAL = _env_float('PREDICTION_POLL_INTERVAL', 0.3)
+
+# --------------------------------------------------------
+# LIMITEUR DE CONCURRENCE ADAPTATIF
+# --------------------------------------------------------
+# Bornes et valeur initiale du nombre de requêtes simultanées au backend
+LIMITER_INITIAL_LIMIT = _env_int('LIMITER_INITIAL_LIMIT', 8)
+LIMITER_MIN_LIMIT = _env_int('LIMITER_MIN_LIMIT', 1)
+LIMITER_MAX_LIMIT = _env_int('LIMITER_MAX_LIMIT', 64)
+# File d'attente au-delà de la limite : taille max et délai max (s)
+LIMITER_MAX_QUEUE = _env_int('LIMITER_MAX_QUEUE', 32)
+LIMITER_QUEUE_TIMEOUT = _env_float('LIMITER_QUEUE_TIMEOUT', 5.0)
+# Surcharge si latence récente (moyenne courte) > tolérance x latence de référence (moyenne longue)
+LIMITER_LATENCY_TOLERANCE = _env_float('LIMITER_LATENCY_TOLERANCE', 2.0)
+# Facteur de réduction multiplicative en cas de surcharge ou d'erreur
+LIMITER_BACKOFF_RATIO = _env_float('LIMITER_BACKOFF_RATIO', 0.9)
+
+# --------------------------------------------------------
+# DÉTECTION EN CONTINU
+# --------------------------------------------------------
+# URL renvoyant la dernière image de la caméra du poste (ex. mjpg-streamer
+# `?action=snapshot`) ; le mode continu est désactivé si vide
+LIVE_CAMERA_URL = os.environ.get('LIVE_CAMERA_URL', '')
+# Délai max (s) de connexion et de lecture d'une image de la caméra, sans réessai
+LIVE_CAMERA_TIMEOUT = _env_float('LIVE_CAMERA_TIMEOUT', 1.0)
+# Fréquence d'échantillonnage des images (par seconde) ; au moins 0,1 car
+# le fragment du mode continu est relancé toutes les 1 / LIVE_FPS secondes
+LIVE_FPS = max(_env_float('LIVE_FPS', 2.0), 0.1)
+
+# --------------------------------------------------------
+# DÉDOUBLONNAGE PERCEPTUEL (CAMÉRA)
+# --------------------------------------------------------
+# Distance de Hamming max (sur 64 bits) pour réutiliser une prédiction ;
+# 0 désactive le dédoublonnage
+PHASH_THRESHOLD = _env_int('PHASH_THRESHOLD', 2)
+# Nombre d'empreintes récentes conservées
+PHASH_INDEX_SIZE = _env_int('PHASH_INDEX_SIZE', 64)
+
+# --------------------------------------------------------
+# APERÇUS
+# --------------------------------------------------------
+# Plus grand côté (px) des aperçus envoyés au navigateur
+THUMBNAIL_MAX_EDGE = _env_int('THUMBNAIL_MAX_EDGE', 640)
+THUMBNAIL_CACHE_SIZE = _env_int('THUMBNAIL_CACHE_SIZE', 256)
+# Aperçus annotés (boîtes de détection) gardés en cache
+OVERLAY_CACHE_SIZE = _env_int('OVERLAY_CACHE_SIZE', 64)
+# Score minimal d'une détection pour être dessinée
+OVERLAY_MIN_SCORE = _env_float('OVERLAY_MIN_SCORE', 0.3)
+
+# --------------------------------------------------------
+# MÉTRIQUES
+# --------------------------------------------------------
+# Port de l'endpoint Prometheus (/metrics) ; 0 désactive
+METRICS_PORT = _env_int('METRICS_PORT', 0)
+# Adresse d'écoute de l'endpoint (0.0.0.0 pour un scrape depuis un autre hôte)
+METRICS_BIND = os.environ.get('METRICS_BIND', '127.0.0.1')
+# Fichier texte Prometheus réécrit périodiquement (textfile collector) ; vide désactive
+METRICS_FILE = os.environ.get('METRICS_FILE', '')
+METRICS_FILE_INTERVAL = _env_float('METRICS_FILE_INTERVAL', 15.0)
+# Affiche le panneau opérations sans `?ops=1` dans l'URL
+OPS_PANEL = os.environ.get('OPS_PANEL', '') not in ('', '0', 'false')
+
+# --------------------------------------------------------
+# INFÉRENCE LOCALE (CPU)
+# --------------------------------------------------------
+# remote : backend seul ; fallback : modèle local si le backend échoue ;
+# local : modèle local seul (bornes sans réseau)
+INFERENCE_MODE = os.environ.get('INFERENCE_MODE', 'remote').lower()
+# Classifieur exporté (.onnx ou .tflite) ; vide désactive l'inférence locale
+LOCAL_MODEL_PATH = os.environ.get('LOCAL_MODEL_PATH', '')
+# Catégories dans l'ordre des sorties du modèle
+LOCAL_MODEL_LABELS = [label.strip() for label in os.environ.get(
+    'LOCAL_MODEL_LABELS', 'cardboard,glass,metal,paper,plastic,trash').split(',') if label.strip()]
+LOCAL_MODEL_THREADS = _env_int('LOCAL_MODEL_THREADS', 2)
+# Timeout de lecture (s) vers le backend en mode fallback, pour basculer vite
+FALLBACK_READ_TIMEOUT = _env_float('FALLBACK_READ_TIMEOUT', 5.0)
+
+# --------------------------------------------------------
+# ROUTAGE MULTI-BACKENDS
+# --------------------------------------------------------
+# Clés de st.secrets des backends entre lesquels router (ex.
+# `local_api_uri,local_docker_uri,cloud_api_uri`) ; vide : API_URI seul
+ROUTING_BACKENDS = [key.strip() for key in os.environ.get('ROUTING_BACKENDS', '').split(',') if key.strip()]
+# Poids du dernier échantillon dans la latence moyenne exponentielle
+ROUTING_EWMA_ALPHA = _env_float('ROUTING_EWMA_ALPHA', 0.3)
+# Délai (s) avant requête de couverture tant que le p95 du backend est
+# inconnu (moins de 20 échantillons) ; 0 désactive la couverture
+ROUTING_HEDGE_DELAY = _env_float('ROUTING_HEDGE_DELAY', 1.0)
+# Disjoncteur : échecs consécutifs avant retrait, durée du retrait (s)
+BREAKER_FAILURES = _env_int('BREAKER_FAILURES', 5)
+BREAKER_COOLDOWN = _env_float('BREAKER_COOLDOWN', 30.0)
+
+# --------------------------------------------------------
+# HISTORIQUE PAR SESSION
+# --------------------------------------------------------
+# Analyses gardées par session (les plus anciennes sont oubliées)
+HISTORY_SIZE = _env_int('HISTORY_SIZE', 20)
+# Historique d'une session inactive depuis ce délai (s) libéré
+HISTORY_IDLE_TIMEOUT = _env_float('HISTORY_IDLE_TIMEOUT', 1800.0)
+# Vignettes de l'historique : plus grand côté (px) et nombre gardé (toutes sessions)
+HISTORY_THUMBNAIL_EDGE = _env_int('HISTORY_THUMBNAIL_EDGE', 96)
+HISTORY_THUMBNAIL_CACHE = _env_int('HISTORY_THUMBNAIL_CACHE', 1024)
+
+# --------------------------------------------------------
+# JOURNAL DES PRÉDICTIONS (SQLITE)
+# --------------------------------------------------------
+# Base SQLite (mode WAL) où chaque prédiction est ajoutée ; vide désactive
+PREDICTION_LOG_PATH = os.environ.get('PREDICTION_LOG_PATH', 'data/predictions.sqlite3')
+# Écriture par lots en arrière-plan : taille max d'un lot, délai max (s)
+PREDICTION_LOG_BATCH = _env_int('PREDICTION_LOG_BATCH', 500)
+PREDICTION_LOG_FLUSH_INTERVAL = _env_float('PREDICTION_LOG_FLUSH_INTERVAL', 1.0)
+# Prédictions en attente d'écriture au-delà desquelles on abandonne (disque bloqué)
+PREDICTION_LOG_QUEUE = _env_int('PREDICTION_LOG_QUEUE', 10000)
+# Lignes par page de la page Historique
+HISTORY_PAGE_SIZE = _env_int('HISTORY_PAGE_SIZE', 50)
+
+# --------------------------------------------------------
+# STATISTIQUES D'IMPACT
+# --------------------------------------------------------
+# Prédictions prises en compte dans la confiance moyenne glissante
+IMPACT_CONFIDENCE_WINDOW = _env_int('IMPACT_CONFIDENCE_WINDOW', 1000)
@@ -0,0 +1,117 @@
+"""Métriques d'évaluation vectorisées (NumPy) pour les résultats test_all."""
+from array import array
+
+import numpy as np
+
+from wastewise.test_all import record_outcome
+
+
+class EvaluationColumns:
+    """Accumule les prédictions en colonnes compactes (8 octets / image)"""
+
+    def __init__(self):
+        self.class_names = []
+        self._class_index = {}
+        self._expected = array('h')
+        self._predicted = array('h')
+        self._confidence = array('f')
+
+    def __len__(self):
+        return len(self._expected)
+
+    def _index(self, name):
+        index = self._class_index.get(name)
+        if index is None:
+            index = self._class_index[name] = len(self.class_names)
+            self.class_names.append(name)
+        return index
+
+    def add(self, record):
+        expected, predicted, confidence = record_outcome(record)
+        if expected is None or predicted is None:
+            return
+        self._expected.append(self._index(str(expected)))
+        self._predicted.append(self._index(str(predicted)))
+        self._confidence.append(confidence)
+
+    def to_arrays(self):
+        """Retourne (y_true, y_pred, confiances) sans copie des buffers"""
+        return (np.frombuffer(self._expected, dtype=np.int16),
+                np.frombuffer(self._predicted, dtype=np.int16),
+                np.frombuffer(self._confidence, dtype=np.float32))
+
+
+def confusion_matrix(y_true, y_pred, n_classes):
+    """Matrice de confusion (lignes : classe réelle, colonnes : prédite)"""
+    flat = y_true.astype(np.int64) * n_classes + y_pred
+    return np.bincount(flat, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def per_class_metrics(cm):
+    """Précision, rappel, F1 et support par classe depuis la matrice de confusion"""
+    tp = np.diag(cm).astype(np.float64)
+    predicted = cm.sum(axis=0)
+    support = cm.sum(axis=1)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+    return precision, recall, f1, support
+
+
+def calibration(confidence, correct, n_bins=10):
+    """Histogramme de calibration : effectif, précision et confiance moyenne par tranche.
+
+    Retourne aussi l'ECE (expected calibration error).
+    """
+    bins = np.minimum((confidence * n_bins).astype(np.int64), n_bins - 1)
+    bins = np.maximum(bins, 0)
+    counts = np.bincount(bins, minlength=n_bins)
+    hits = np.bincount(bins, weights=correct, minlength=n_bins)
+    conf_sum = np.bincount(bins, weights=confidence, minlength=n_bins)
+    accuracy = np.divide(hits, counts, out=np.zeros(n_bins), where=counts > 0)
+    mean_conf = np.divide(conf_sum, counts, out=np.zeros(n_bins), where=counts > 0)
+    ece = float(np.sum(counts * np.abs(accuracy - mean_conf)) / max(counts.sum(), 1))
+    return counts, accuracy, mean_conf, ece
+
+
+def threshold_sweep(confidence, correct, thresholds):
+    """Couverture et précision des prédictions gardées pour chaque seuil de confiance"""
+    order = np.argsort(confidence)[::-1]
+    sorted_conf = confidence[order]
+    cum_correct = np.concatenate(([0], np.cumsum(correct[order])))
+    # Nombre de prédictions de confiance >= seuil (tableau trié décroissant)
+    kept = np.searchsorted(-sorted_conf, -thresholds, side='right')
+    coverage = kept / max(len(confidence), 1)
+    accuracy = np.divide(cum_correct[kept], kept, out=np.zeros(len(thresholds)), where=kept > 0)
+    return coverage, accuracy
+
+
+def evaluation_report(columns, n_bins=10, n_thresholds=21):
+    """Calcule toutes les métriques du tableau de bord en une passe vectorisée"""
+    y_true, y_pred, confidence = columns.to_arrays()
+    n_classes = len(columns.class_names)
+    correct = (y_true == y_pred).astype(np.float64)
+    cm = confusion_matrix(y_true, y_pred, n_classes)
+    precision, recall, f1, support = per_class_metrics(cm)
+    counts, bin_accuracy, bin_conf, ece = calibration(confidence, correct, n_bins)
+    thresholds = np.linspace(0, 1, n_thresholds)
+    coverage, sweep_accuracy = threshold_sweep(confidence, correct, thresholds)
+    return {
+        'classes': list(columns.class_names),
+        'count': len(columns),
+        'accuracy': float(correct.mean()) if len(columns) else 0.0,
+        'macro_f1': float(f1[support > 0].mean()) if support.any() else 0.0,
+        'confusion_matrix': cm,
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'support': support,
+        'calibration_counts': counts,
+        'calibration_accuracy': bin_accuracy,
+        'calibration_confidence': bin_conf,
+        'ece': ece,
+        'thresholds': thresholds,
+        'coverage': coverage,
+        'threshold_accuracy': sweep_accuracy,
+    }
@@ -0,0 +1,118 @@
+"""Historique borné des analyses de chaque session."""
+import threading
+import time
+import uuid
+from collections import deque
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.thumbnails import content_hash, get_icon_store
+
+
+class HistoryEntry:
+    """Une analyse passée : résultat résumé et empreinte de la vignette"""
+
+    __slots__ = ('timestamp', 'category', 'confidence', 'source', 'origin', 'digest')
+
+    def __init__(self, timestamp, category, confidence, source, origin, digest):
+        self.timestamp = timestamp
+        self.category = category
+        self.confidence = confidence
+        self.source = source
+        self.origin = origin
+        self.digest = digest
+
+
+class SessionHistory:
+    """Dernières analyses d'une session, des plus récentes aux plus anciennes"""
+
+    __slots__ = ('entries', 'last_seen')
+
+    def __init__(self, max_length):
+        self.entries = deque(maxlen=max_length)
+        self.last_seen = time.monotonic()
+
+
+class HistoryRegistry:
+    """Historiques de toutes les sessions du process.
+
+    Indexé par un identifiant stocké dans `st.session_state` ; une session
+    restée inactive plus de `idle_timeout` secondes est oubliée au passage
+    suivant du balayage (au plus une fois par `sweep_interval`).
+    """
+
+    def __init__(self, max_length, idle_timeout, sweep_interval=60.0):
+        self.max_length = max_length
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.evicted = 0
+        self._sessions = {}
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id, now):
+        history = self._sessions.get(session_id)
+        if history is None:
+            history = self._sessions[session_id] = SessionHistory(self.max_length)
+        history.last_seen = now
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+        return history
+
+    def _sweep(self, now):
+        idle = [session_id for session_id, history in self._sessions.items()
+                if now - history.last_seen > self.idle_timeout]
+        for session_id in idle:
+            del self._sessions[session_id]
+        self.evicted += len(idle)
+        self._last_sweep = now
+
+    def add(self, session_id, entry):
+        with self._lock:
+            self._session(session_id, time.monotonic()).entries.appendleft(entry)
+
+    def entries(self, session_id):
+        with self._lock:
+            return list(self._session(session_id, time.monotonic()).entries)
+
+    def clear(self, session_id):
+        with self._lock:
+            self._session(session_id, time.monotonic()).entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'entries': sum(len(history.entries) for history in self._sessions.values()),
+                'evicted': self.evicted,
+            }
+
+
+@st.cache_resource
+def get_history_registry():
+    return HistoryRegistry(config.HISTORY_SIZE, config.HISTORY_IDLE_TIMEOUT)
+
+
+def session_id():
+    """Identifiant de la session courante dans le registre"""
+    if 'history_id' not in st.session_state:
+        st.session_state.history_id = uuid.uuid4().hex
+    return st.session_state.history_id
+
+
+def record_analysis(image_bytes, result, origin, digest=None):
+    """Ajoute une analyse à l'historique de la session courante"""
+    digest = digest or content_hash(image_bytes)
+    get_icon_store().add(digest, image_bytes)
+    get_history_registry().add(session_id(), HistoryEntry(
+        time.time(), result.get('category', 'Inconnu'), float(result.get('confidence', 0)),
+        result.get('source', 'backend'), origin, digest))
+
+
+def session_entries():
+    return get_history_registry().entries(session_id())
+
+
+def clear_history():
+    get_history_registry().clear(session_id())
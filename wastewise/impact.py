@@ -0,0 +1,79 @@
+"""Statistiques d'impact (page À Propos) tenues à jour à chaque prédiction."""
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from wastewise import config
+
+
+class ImpactStats:
+    """Agrégats courants : total, comptes par catégorie, confiance glissante.
+
+    Chaque prédiction les met à jour en O(1) ; `snapshot` ne fait que
+    copier quelques compteurs (un par catégorie), quel que soit le nombre
+    de prédictions servies. La précision vient du dernier run test_all.
+    """
+
+    def __init__(self, window):
+        self.total = 0
+        self.by_category = {}
+        self.evaluation = None
+        self._recent = deque(maxlen=window)
+        self._recent_sum = 0.0
+        self._since_resum = 0
+        self._lock = threading.Lock()
+
+    def _push(self, confidence):
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_sum -= self._recent[0]
+        self._recent.append(confidence)
+        self._recent_sum += confidence
+        # Somme recalculée à chaque tour de fenêtre pour borner l'erreur d'arrondi
+        self._since_resum += 1
+        if self._since_resum >= self._recent.maxlen:
+            self._recent_sum = sum(self._recent)
+            self._since_resum = 0
+
+    def seed(self, counts, confidences):
+        """Reprend les agrégats d'un journal existant (au démarrage)"""
+        with self._lock:
+            for category, count in counts.items():
+                self.by_category[category] = self.by_category.get(category, 0) + count
+                self.total += count
+            for confidence in confidences:
+                self._push(confidence)
+
+    def record(self, result):
+        category = result.get('category', 'Inconnu')
+        confidence = float(result.get('confidence', 0))
+        with self._lock:
+            self.total += 1
+            self.by_category[category] = self.by_category.get(category, 0) + 1
+            self._push(confidence)
+
+    def record_evaluation(self, accuracy, count):
+        """Retient la précision du dernier run test_all"""
+        with self._lock:
+            self.evaluation = {'accuracy': accuracy, 'count': count, 'timestamp': time.time()}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'total': self.total,
+                'by_category': dict(self.by_category),
+                'mean_confidence': self._recent_sum / len(self._recent) if self._recent else None,
+                'evaluation': self.evaluation,
+            }
+
+
+@st.cache_resource
+def get_impact_stats():
+    """Agrégats partagés par les sessions, repris du journal SQLite s'il existe"""
+    from wastewise.prediction_log import summary
+
+    stats = ImpactStats(config.IMPACT_CONFIDENCE_WINDOW)
+    if config.PREDICTION_LOG_PATH:
+        stats.seed(*summary(config.PREDICTION_LOG_PATH, config.IMPACT_CONFIDENCE_WINDOW))
+    return stats
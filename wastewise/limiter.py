@@ -0,0 +1,145 @@
+"""Limiteur de concurrence adaptatif (AIMD) pour les appels au backend."""
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from wastewise import config
+
+
+class BackendOverloaded(Exception):
+    """Requête refusée : file d'attente pleine ou délai d'attente dépassé"""
+
+
+def is_backend_failure(exc):
+    """Vrai si l'erreur met en cause le backend (et pas la requête ou le client)"""
+    if isinstance(exc, BackendOverloaded):
+        return False
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status is None or status >= 500
+
+
+class AdaptiveLimiter:
+    """Borne les requêtes en vol et ajuste la borne selon latence et erreurs.
+
+    Augmentation additive (+1 par « fenêtre » de `limit` réponses saines),
+    réduction multiplicative dès qu'une réponse échoue ou que la latence
+    récente (moyenne mobile courte, sur une dizaine de réponses) dépasse
+    `latency_tolerance` fois la latence de référence (moyenne mobile longue,
+    sur `window` réponses). Les deux moyennes lissent la gigue ordinaire :
+    une réponse isolément lente ne compte pas comme une surcharge.
+    """
+
+    def __init__(self, initial_limit, min_limit, max_limit, max_queue,
+                 queue_timeout, latency_tolerance, backoff_ratio, window=100, short_window=10):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.rejected = 0
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._queued = 0
+        self._long_alpha = 1 / window
+        self._short_alpha = 1 / short_window
+        self._baseline = None
+        self._recent = None
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        return max(self.min_limit, int(self._limit))
+
+    def acquire(self, timeout=None):
+        """Attend une place libre ; lève BackendOverloaded sinon"""
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._cond:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise BackendOverloaded("Serveur surchargé, réessayez dans un instant")
+
+            self._queued += 1
+            deadline = time.monotonic() + timeout
+            try:
+                while self._in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise BackendOverloaded("Délai d'attente du serveur dépassé, réessayez")
+                    self._cond.wait(remaining)
+                self._in_flight += 1
+            finally:
+                self._queued -= 1
+
+    def release(self, latency, ok=True):
+        """Libère une place et ajuste la limite selon la réponse observée"""
+        with self._cond:
+            self._in_flight -= 1
+            if ok:
+                if self._baseline is None:
+                    self._baseline = self._recent = latency
+                self._recent += self._short_alpha * (latency - self._recent)
+                self._baseline += self._long_alpha * (latency - self._baseline)
+                overloaded = self._recent > self._baseline * self.latency_tolerance
+            else:
+                overloaded = True
+
+            if overloaded:
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+            elif self._in_flight + 1 >= self.limit:
+                # N'augmente que si la limite actuelle est réellement utilisée
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Contexte d'une requête : acquire, mesure de latence, release.
+
+        Seules les pannes du backend (connexion, délai, 5xx) comptent comme
+        des échecs : une requête refusée (4xx) a reçu une réponse saine.
+        """
+        self.acquire()
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        except Exception as exc:
+            ok = not is_backend_failure(exc)
+            raise
+        finally:
+            self.release(time.perf_counter() - start, ok)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'queued': self._queued,
+                'rejected': self.rejected,
+            }
+
+
+def new_limiter():
+    """Limiteur réglé par la configuration"""
+    return AdaptiveLimiter(
+        initial_limit=config.LIMITER_INITIAL_LIMIT,
+        min_limit=config.LIMITER_MIN_LIMIT,
+        max_limit=config.LIMITER_MAX_LIMIT,
+        max_queue=config.LIMITER_MAX_QUEUE,
+        queue_timeout=config.LIMITER_QUEUE_TIMEOUT,
+        latency_tolerance=config.LIMITER_LATENCY_TOLERANCE,
+        backoff_ratio=config.LIMITER_BACKOFF_RATIO,
+    )
+
+
+@st.cache_resource
+def get_limiter():
+    """Limiteur unique pour le process, traversé par tous les appels au backend"""
+    return new_limiter()
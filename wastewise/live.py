@@ -0,0 +1,99 @@
+"""Détection en continu sur les images d'une caméra échantillonnées à cadence fixe."""
+import time
+from collections import deque
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.background import get_prediction_executor
+from wastewise.batch import timed_detect
+
+
+@st.cache_resource
+def get_camera_session():
+    """Session HTTP de la caméra, sans réessais : une image manquée est remplacée par la suivante"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def grab_frame(camera_url):
+    """Récupère l'image courante de la caméra.
+
+    Appelée dans le fragment du mode continu : le délai court borne le
+    temps pendant lequel une caméra bloquée fige l'affichage.
+    """
+    timeout = (config.LIVE_CAMERA_TIMEOUT, config.LIVE_CAMERA_TIMEOUT)
+    response = get_camera_session().get(camera_url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+class LiveSession:
+    """État du mode continu d'une session.
+
+    Une seule classification est en vol à la fois : les images échantillonnées
+    pendant qu'elle s'exécute sont affichées mais pas envoyées, ce qui
+    évite toute file d'attente vers le backend.
+    """
+
+    def __init__(self, window=20):
+        self.frames_sampled = 0
+        self.frames_dropped = 0
+        self.frames_classified = 0
+        self.last_frame = None
+        self.last_result = None
+        self.last_error = None
+        self.last_latency = None
+        self._future = None
+        self._completed_at = deque(maxlen=window)
+
+    @property
+    def busy(self):
+        return self._future is not None and not self._future.done()
+
+    def submit(self, frame, api_url):
+        """Échantillonne une image ; la classifie si aucune requête n'est en vol"""
+        self.frames_sampled += 1
+        self.last_frame = frame
+        self.poll()
+        if self.busy:
+            self.frames_dropped += 1
+            return False
+        # Pool des analyses interactives : un lot en cours ne retarde pas le flux.
+        # Pas de dédoublonnage : devant une caméra fixe, deux objets successifs
+        # sur le même fond ont des empreintes proches
+        self._future = get_prediction_executor().submit(timed_detect, frame, api_url)
+        return True
+
+    def poll(self):
+        """Récupère le résultat de la requête en vol si elle est terminée"""
+        if self._future is None or not self._future.done():
+            return
+        result, error, latency = self._future.result()
+        self._future = None
+        self.last_latency = latency
+        self.last_error = error
+        if error is None:
+            self.last_result = result
+            self.frames_classified += 1
+            self._completed_at.append(time.monotonic())
+
+    @property
+    def fps(self):
+        """Images classifiées par seconde sur la fenêtre récente"""
+        if len(self._completed_at) < 2:
+            return 0.0
+        # Mesuré jusqu'à maintenant pour retomber à 0 si le flux s'arrête
+        span = time.monotonic() - self._completed_at[0]
+        return (len(self._completed_at) - 1) / span if span > 0 else 0.0
+
+    def stop(self):
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
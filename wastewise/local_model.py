@@ -0,0 +1,186 @@
+"""Inférence locale sur CPU avec un classifieur exporté (ONNX ou TFLite).
+
+Le modèle est chargé une fois par processus et retourne le même dict que
+le backend (`category`, `confidence`, `description`, `recycling_tips`),
+marqué `source: local`. Les runtimes sont optionnels : `onnxruntime` pour
+un `.onnx`, `tflite_runtime` (ou `tensorflow`) pour un `.tflite`.
+"""
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.buffers import open_buffer
+from wastewise.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Textes affichés à la place de ceux du backend, par catégorie
+LOCAL_TIPS = {
+    'cardboard': ("Carton", "Aplatir et déposer dans le bac de tri (jaune)."),
+    'paper': ("Papier", "Déposer dans le bac de tri, sans le froisser."),
+    'plastic': ("Plastique", "Vider et déposer dans le bac de tri (jaune)."),
+    'metal': ("Métal", "Canettes, boîtes et aérosols vides vont dans le bac de tri."),
+    'glass': ("Verre", "Déposer dans la colonne à verre, sans bouchon."),
+    'organic': ("Déchet organique", "Composter ou déposer dans le bac biodéchets."),
+    'trash': ("Déchet résiduel", "Non recyclable : poubelle des ordures ménagères."),
+}
+
+
+class _OnnxRunner:
+    """Session onnxruntime (thread-safe) limitée au CPU"""
+
+    def __init__(self, path, threads):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(path, sess_options=options,
+                                             providers=['CPUExecutionProvider'])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_shape = model_input.shape
+        self.quantized = model_input.type == 'tensor(uint8)'
+
+    def run(self, batch):
+        return self._session.run(None, {self._input_name: batch})[0][0]
+
+
+class _TFLiteRunner:
+    """Interpréteur TFLite ; non thread-safe, donc sérialisé par un verrou"""
+
+    def __init__(self, path, threads):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self._interpreter = Interpreter(model_path=path, num_threads=threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._lock = threading.Lock()
+        self.input_shape = list(self._input['shape'])
+        self.quantized = self._input['dtype'].__name__ == 'uint8'
+
+    def run(self, batch):
+        with self._lock:
+            self._interpreter.set_tensor(self._input['index'], batch)
+            self._interpreter.invoke()
+            output = self._interpreter.get_tensor(self._output['index'])[0]
+        scale, zero_point = self._output.get('quantization', (0.0, 0))
+        if scale:
+            output = (output.astype('float32') - zero_point) * scale
+        return output
+
+
+RUNNERS = {'.onnx': _OnnxRunner, '.tflite': _TFLiteRunner}
+
+
+class LocalModel:
+    """Classifieur local : prétraitement, inférence et mise en forme du résultat"""
+
+    def __init__(self, runner, labels):
+        self._runner = runner
+        self.labels = labels
+        shape = runner.input_shape
+        # NCHW si la 2e dimension vaut 3 (export PyTorch), NHWC sinon (Keras)
+        self.channels_first = len(shape) == 4 and shape[1] == 3
+        height, width = (shape[2], shape[3]) if self.channels_first else (shape[1], shape[2])
+        self.size = (width if isinstance(width, int) else config.IMAGE_MAX_EDGE,
+                     height if isinstance(height, int) else config.IMAGE_MAX_EDGE)
+        self.predictions = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def _input_tensor(self, image_bytes):
+        import numpy as np
+        from PIL import Image, ImageOps
+
+        with Image.open(open_buffer(image_bytes)) as image:
+            image.draft('RGB', self.size)
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            image = image.resize(self.size, Image.Resampling.BILINEAR)
+        if self._runner.quantized:
+            batch = np.asarray(image, dtype=np.uint8)[np.newaxis]
+        else:
+            batch = np.asarray(image, dtype=np.float32)[np.newaxis] / 255.0
+        if self.channels_first:
+            batch = batch.transpose(0, 3, 1, 2)
+        return np.ascontiguousarray(batch)
+
+    def result(self, scores):
+        """Dict résultat au format du backend à partir du vecteur de sorties"""
+        import numpy as np
+
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        # Logits -> probabilités si le modèle n'inclut pas de softmax
+        if scores.min() < 0 or abs(scores.sum() - 1) > 1e-3:
+            scores = np.exp(scores - scores.max())
+            scores /= scores.sum()
+        index = int(scores.argmax())
+        category = self.labels[index] if index < len(self.labels) else f'classe_{index}'
+        name, tips = LOCAL_TIPS.get(category.lower(), (category, "Vérifier les consignes de tri locales."))
+        return {
+            'category': category,
+            'confidence': round(float(scores[index]), 4),
+            'description': f"{name} (modèle local, sans appel au backend).",
+            'recycling_tips': tips,
+            'source': 'local',
+        }
+
+    def predict(self, image_bytes):
+        start = time.perf_counter()
+        batch = self._input_tensor(image_bytes)
+        infer_start = time.perf_counter()
+        scores = self._runner.run(batch)
+        end = time.perf_counter()
+
+        metrics = get_metrics()
+        metrics.observe('wastewise_backend_phase_seconds', infer_start - start, backend='local', phase='preprocess')
+        metrics.observe('wastewise_backend_phase_seconds', end - infer_start, backend='local', phase='inference')
+        metrics.observe('wastewise_backend_request_seconds', end - start, backend='local')
+        with self._lock:
+            self.predictions += 1
+        return self.result(scores)
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def stats(self):
+        with self._lock:
+            return {'predictions': self.predictions, 'fallbacks': self.fallbacks}
+
+
+def load_model(path, labels=None, threads=None):
+    """Charge un modèle `.onnx` ou `.tflite` ; ImportError si le runtime manque"""
+    runner_class = RUNNERS.get(os.path.splitext(path)[1].lower())
+    if runner_class is None:
+        raise ValueError(f"Format de modèle non supporté : {path} (attendu .onnx ou .tflite)")
+    runner = runner_class(path, threads or config.LOCAL_MODEL_THREADS)
+    return LocalModel(runner, labels or config.LOCAL_MODEL_LABELS)
+
+
+@st.cache_resource
+def get_local_model():
+    """Modèle local partagé par les sessions, ou None s'il n'est pas configuré"""
+    if not config.LOCAL_MODEL_PATH:
+        return None
+    # Résultat mis en cache, None compris : l'erreur n'est journalisée qu'une fois
+    # et chaque analyse passe ensuite par le backend seul
+    try:
+        model = load_model(config.LOCAL_MODEL_PATH)
+    except ImportError as exc:
+        logger.warning("Inférence locale désactivée, runtime absent : %s", exc)
+        return None
+    except Exception as exc:
+        logger.error("Inférence locale désactivée, modèle illisible (%s) : %s", config.LOCAL_MODEL_PATH, exc)
+        return None
+    logger.info("Modèle local chargé : %s (entrée %sx%s)", config.LOCAL_MODEL_PATH, *model.size)
+    return model
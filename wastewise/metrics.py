@@ -0,0 +1,232 @@
+"""Histogrammes de latence en mémoire et export au format texte Prometheus."""
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+from wastewise import config
+
+# Bornes (secondes) des buckets : de la milliseconde à la minute
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger(__name__)
+
+HELP = {
+    'wastewise_backend_phase_seconds': "Durée de chaque phase d'un appel au backend",
+    'wastewise_backend_request_seconds': "Durée totale d'un appel au backend",
+    'wastewise_render_seconds': "Durée de rendu de la carte de résultat",
+}
+
+
+class _Series:
+    """Une série d'histogramme : buckets cumulés + échantillons récents"""
+
+    __slots__ = ('counts', 'total', 'count', 'recent')
+
+    def __init__(self, n_buckets, window):
+        self.counts = [0] * n_buckets
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+
+class MetricsRegistry:
+    """Histogrammes étiquetés, thread-safe.
+
+    Les buckets alimentent l'export Prometheus ; une fenêtre des derniers
+    échantillons permet des percentiles exacts pour le panneau opérations.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = buckets
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets), self.window)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.counts[i] += 1
+            series.total += value
+            series.count += 1
+            series.recent.append(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def percentiles(self, name, quantiles=(0.5, 0.95, 0.99)):
+        """{étiquettes: [p50, p95, p99, n]} sur la fenêtre d'échantillons récents"""
+        rows = {}
+        with self._lock:
+            items = [(labels, sorted(series.recent))
+                     for (series_name, labels), series in self._series.items()
+                     if series_name == name and series.recent]
+        for labels, samples in items:
+            rows[labels] = [samples[min(int(q * len(samples)), len(samples) - 1)]
+                            for q in quantiles] + [len(samples)]
+        return rows
+
+    def render_prometheus(self, gauges=None):
+        """Texte au format d'exposition Prometheus 0.0.4"""
+        lines = []
+        with self._lock:
+            by_name = {}
+            for (name, labels), series in sorted(self._series.items()):
+                by_name.setdefault(name, []).append((labels, series))
+            for name, entries in by_name.items():
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, series in entries:
+                    for bound, count in zip(self.buckets, series.counts):
+                        lines.append(f"{name}_bucket{_labels(labels, le=bound)} {count}")
+                    lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {series.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {series.total}")
+                    lines.append(f"{name}_count{_labels(labels)} {series.count}")
+        # Clé de jauge : nom, ou (nom, étiquettes) pour une jauge étiquetée
+        by_name = {}
+        for key, value in (gauges or {}).items():
+            name, labels = (key, ()) if isinstance(key, str) else key
+            by_name.setdefault(name, []).append((labels, value))
+        for name, entries in sorted(by_name.items()):
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in sorted(entries):
+                lines.append(f"{name}{_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+@st.cache_resource
+def get_metrics():
+    """Registre unique pour le process"""
+    return MetricsRegistry()
+
+
+def collect_gauges():
+    """Compteurs des autres briques (cache, limiteur, dédoublonnage, regroupement, historique, journal, impact, modèle local, routeur)"""
+    from wastewise.cache import get_prediction_cache
+    from wastewise.history import get_history_registry
+    from wastewise.impact import get_impact_stats
+    from wastewise.limiter import get_limiter
+    from wastewise.local_model import get_local_model
+    from wastewise.phash import get_dedupe_stats
+    from wastewise.prediction_log import get_prediction_log
+    from wastewise.router import get_router
+    from wastewise.singleflight import get_single_flight
+    from wastewise.thumbnails import get_icon_store
+
+    sources = [('wastewise_cache', get_prediction_cache().stats()),
+               ('wastewise_limiter', get_limiter().stats()),
+               ('wastewise_phash', get_dedupe_stats().stats()),
+               ('wastewise_singleflight', get_single_flight().stats()),
+               ('wastewise_history', get_history_registry().stats()),
+               ('wastewise_history_icons', get_icon_store().stats())]
+    local_model = get_local_model()
+    if local_model is not None:
+        sources.append(('wastewise_local', local_model.stats()))
+
+    gauges = {}
+    for prefix, stats in sources:
+        for key, value in stats.items():
+            gauges[f'{prefix}_{key}'] = value
+    prediction_log = get_prediction_log()
+    if prediction_log is not None:
+        for key, value in prediction_log.stats().items():
+            gauges[f'wastewise_prediction_log_{key}'] = value
+    impact = get_impact_stats().snapshot()
+    for category, count in impact['by_category'].items():
+        gauges[('wastewise_impact_predictions', (('category', category),))] = count
+    if impact['mean_confidence'] is not None:
+        gauges['wastewise_impact_mean_confidence'] = round(impact['mean_confidence'], 4)
+    router = get_router()
+    if router is not None:
+        for row in router.stats():
+            labels = (('backend', row['backend']),)
+            gauges[('wastewise_router_open', labels)] = int(row['state'] != 'closed')
+            for key in ('limit', 'ewma_ms', 'requests', 'errors', 'hedges', 'hedge_wins'):
+                if row[key] is not None:
+                    gauges[(f'wastewise_router_{key}', labels)] = row[key]
+    return gauges
+
+
+def exposition():
+    return get_metrics().render_prometheus(collect_gauges())
+
+
+# --------------------------------------------------------
+# Export : endpoint HTTP et/ou fichier texte
+# --------------------------------------------------------
+def _write_metrics_file(path, interval):
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(exposition())
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            # Réessayé à la période suivante (répertoire monté plus tard, disque plein...)
+            logger.warning("Écriture de %s impossible : %s", path, exc)
+        time.sleep(interval)
+
+
+@st.cache_resource
+def start_exporters():
+    """Démarre (une fois par process) l'endpoint /metrics et l'écriture du fichier.
+
+    Un port déjà pris n'empêche pas l'app de tourner : l'erreur est
+    journalisée et l'endpoint reste désactivé pour ce process.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = exposition().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = None
+    if config.METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer((config.METRICS_BIND, config.METRICS_PORT), _MetricsHandler)
+        except OSError as exc:
+            logger.error("Endpoint /metrics désactivé, écoute sur %s:%s impossible : %s",
+                         config.METRICS_BIND, config.METRICS_PORT, exc)
+        else:
+            threading.Thread(target=server.serve_forever, daemon=True,
+                             name='wastewise-metrics-http').start()
+    if config.METRICS_FILE:
+        threading.Thread(target=_write_metrics_file, daemon=True, name='wastewise-metrics-file',
+                         args=(config.METRICS_FILE, config.METRICS_FILE_INTERVAL)).start()
+    return server
@@ -0,0 +1,253 @@
+"""Boîtes et étiquettes de détection dessinées sur l'aperçu, en une passe NumPy.
+
+Le backend peut renvoyer, en plus de `category`/`confidence`, une liste
+`detections` de `{box: [x0, y0, x1, y1], label, score}`. Les coordonnées
+de chaque boîte sont normalisées (0-1) ou en pixels de l'image envoyée au
+backend (réduite à IMAGE_MAX_EDGE). Les détections malformées sont
+ignorées : l'aperçu reste affiché, sans leurs boîtes.
+
+Rien n'est dessiné boîte par boîte : les pixels de tous les contours et
+fonds d'étiquettes sont énumérés d'un coup (arange segmenté) puis colorés
+par une seule affectation NumPy ; le texte est composé à partir de glyphes
+rendus une fois, par caractère distinct. Le coût suit le nombre de pixels
+peints, pas la taille de l'image ni le nombre d'appels Python.
+"""
+import functools
+import io
+import math
+import zlib
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.buffers import open_buffer
+from wastewise.thumbnails import content_hash, render_jpeg
+
+# Couleur (RVB) par catégorie ; les autres étiquettes prennent une couleur de PALETTE
+CATEGORY_COLORS = {
+    'cardboard': (141, 110, 99),
+    'paper': (30, 136, 229),
+    'plastic': (253, 216, 53),
+    'metal': (120, 144, 156),
+    'glass': (67, 160, 71),
+    'organic': (124, 179, 66),
+    'trash': (229, 57, 53),
+}
+PALETTE = ((142, 36, 170), (0, 172, 193), (251, 140, 0), (216, 27, 96), (57, 73, 171), (0, 137, 123))
+TEXT_PADDING = 3
+# Dépassement de 1.0 toléré pour une boîte normalisée (arrondis du backend)
+NORMALIZED_OVERSHOOT = 0.05
+
+
+def label_color(label):
+    color = CATEGORY_COLORS.get(str(label).lower())
+    if color is None:
+        color = PALETTE[zlib.crc32(str(label).encode()) % len(PALETTE)]
+    return color
+
+
+@functools.lru_cache(maxsize=512)
+def _glyph(char, size):
+    """Masque d'un caractère : (lignes, colonnes, opacités des pixels allumés, avance en px)"""
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.load_default(size=size)
+    ascent, descent = font.getmetrics()
+    advance = max(1, round(font.getlength(char)))
+    canvas = Image.new('L', (advance + size // 2, ascent + descent))
+    ImageDraw.Draw(canvas).text((0, 0), char, fill=255, font=font)
+    alpha = np.asarray(canvas, dtype=np.float32) / 255.0
+    rows, cols = np.nonzero(alpha)
+    return rows, cols, alpha[rows, cols], advance
+
+
+@functools.lru_cache(maxsize=32)
+def _line_height(size):
+    from PIL import ImageFont
+
+    return sum(ImageFont.load_default(size=size).getmetrics())
+
+
+def _rectangle_pixels(rects):
+    """Coordonnées de tous les pixels de rectangles [y0, y1) x [x0, x1), sans boucle.
+
+    Retourne (lignes, colonnes, indice du rectangle de chaque pixel).
+    """
+    import numpy as np
+
+    y0, y1, x0, x1 = rects.T
+    widths = np.maximum(x1 - x0, 0)
+    counts = np.maximum(y1 - y0, 0) * widths
+    owner = np.repeat(np.arange(len(rects)), counts)
+    # Rang de chaque pixel dans son rectangle (arange segmenté)
+    rank = np.arange(counts.sum()) - np.repeat(counts.cumsum() - counts, counts)
+    row, col = np.divmod(rank, np.maximum(widths, 1)[owner])
+    return y0[owner] + row, x0[owner] + col, owner
+
+
+def draw_detections(pixels, boxes, labels, scores, thickness=None, font_size=None):
+    """Dessine boîtes et étiquettes « label score% » ; retourne une nouvelle image uint8.
+
+    `pixels` : tableau HxWx3 ; `boxes` : tableau Nx4 (x0, y0, x1, y1) en
+    pixels de `pixels` ; `labels`, `scores` : N éléments.
+    """
+    import numpy as np
+
+    height, width = pixels.shape[:2]
+    out = np.array(pixels, dtype=np.uint8)
+    if not len(boxes):
+        return out
+    thickness = thickness or max(2, round(max(height, width) / 240))
+    font_size = font_size or max(10, round(max(height, width) / 45))
+
+    boxes = np.rint(np.asarray(boxes, dtype=np.float64)).astype(np.int64)
+    x0 = boxes[:, 0].clip(0, width - 1)
+    y0 = boxes[:, 1].clip(0, height - 1)
+    x1 = np.maximum(boxes[:, 2].clip(0, width), x0 + 1)
+    y1 = np.maximum(boxes[:, 3].clip(0, height), y0 + 1)
+    t = np.minimum(thickness, np.minimum(x1 - x0, y1 - y0))
+    colors = np.array([label_color(label) for label in labels], dtype=np.uint8)
+
+    # Texte de chaque étiquette, puis avance de chaque caractère
+    texts = [f"{label} {score * 100:.0f}%" for label, score in zip(labels, scores)]
+    lengths = np.array([len(text) for text in texts])
+    chars = ''.join(texts)
+    advances = np.array([_glyph(char, font_size)[3] for char in chars])
+    starts = np.concatenate([[0], lengths.cumsum()[:-1]])
+    text_width = np.add.reduceat(advances, starts)
+    # Position de chaque caractère dans son étiquette (cumul segmenté)
+    offsets = advances.cumsum() - advances
+    offsets -= np.repeat(offsets[starts], lengths)
+
+    tag_h = _line_height(font_size) + 2 * TEXT_PADDING
+    tag_w = text_width + 2 * TEXT_PADDING
+    # Étiquette au-dessus de la boîte, ou juste dedans si elle sortirait de l'image
+    tag_y0 = np.where(y0 - tag_h >= 0, y0 - tag_h, y0)
+    tag_x0 = np.minimum(x0, np.maximum(0, width - tag_w))
+
+    # Contours puis fonds d'étiquettes : une seule affectation, les étiquettes passent devant
+    rects = np.concatenate([
+        np.stack([y0, y0 + t, x0, x1], axis=1),                  # haut
+        np.stack([y1 - t, y1, x0, x1], axis=1),                  # bas
+        np.stack([y0, y1, x0, x0 + t], axis=1),                  # gauche
+        np.stack([y0, y1, x1 - t, x1], axis=1),                  # droite
+        np.stack([tag_y0, np.minimum(tag_y0 + tag_h, height),    # fond de l'étiquette
+                  tag_x0, np.minimum(tag_x0 + tag_w, width)], axis=1),
+    ])
+    ys, xs, owner = _rectangle_pixels(rects)
+    out[ys, xs] = np.tile(colors, (5, 1))[owner]
+    # Étiquette visible en chaque pixel, pour que le texte d'une étiquette recouverte soit masqué
+    tags = owner >= 4 * len(boxes)
+    visible_tag = np.full((height, width), -1, dtype=np.int64)
+    visible_tag[ys[tags], xs[tags]] = owner[tags] - 4 * len(boxes)
+
+    # Texte blanc : pixels des glyphes rassemblés par caractère distinct, fondus en une fois
+    char_x = np.repeat(tag_x0 + TEXT_PADDING, lengths) + offsets
+    char_y = np.repeat(tag_y0 + TEXT_PADDING, lengths)
+    char_codes = np.frombuffer(chars.encode('utf-32-le'), dtype=np.uint32)
+    char_tag = np.repeat(np.arange(len(boxes)), lengths)
+    parts = []
+    for code in np.unique(char_codes):
+        rows, cols, alpha, _ = _glyph(chr(code), font_size)
+        where = np.flatnonzero(char_codes == code)
+        parts.append(((char_y[where, None] + rows).ravel(), (char_x[where, None] + cols).ravel(),
+                      np.tile(alpha, len(where)), np.repeat(char_tag[where], len(rows))))
+    ys, xs, alpha, tag = (np.concatenate(column) for column in zip(*parts))
+    inside = (ys < height) & (xs < width)
+    ys, xs, alpha, tag = ys[inside], xs[inside], alpha[inside], tag[inside]
+    shown = visible_tag[ys, xs] == tag
+    ys, xs, alpha = ys[shown], xs[shown], alpha[shown, None]
+    under = out[ys, xs].astype(np.float32)
+    out[ys, xs] = (under + (255.0 - under) * alpha).round().astype(np.uint8)
+    return out
+
+
+def parse_detections(detections):
+    """Détections exploitables, en tuples (boîte, label, score).
+
+    Une détection sans boîte de 4 nombres finis ou au score non numérique
+    est écartée ; un score absent ou null vaut 1.
+    """
+    if not isinstance(detections, (list, tuple)):
+        return []
+    parsed = []
+    for detection in detections:
+        if not isinstance(detection, dict):
+            continue
+        score = detection.get('score')
+        try:
+            box = tuple(float(value) for value in detection.get('box'))
+            score = 1.0 if score is None else float(score)
+        except (TypeError, ValueError):
+            continue
+        if len(box) == 4 and all(map(math.isfinite, box + (score,))):
+            parsed.append((box, detection.get('label', detection.get('class', '?')), score))
+    return parsed
+
+
+def detection_boxes(detections, size, sent_edge, min_score=None):
+    """Boîtes des détections en pixels d'une image de taille `size` (largeur, hauteur).
+
+    `sent_edge` est le plus grand côté de l'image reçue par le backend,
+    référence des coordonnées en pixels. Retourne (boîtes Nx4, labels, scores).
+    """
+    import numpy as np
+
+    min_score = config.OVERLAY_MIN_SCORE if min_score is None else min_score
+    parsed = [detection for detection in parse_detections(detections) if detection[2] >= min_score]
+    if not parsed:
+        return np.zeros((0, 4)), [], []
+    boxes = np.array([box for box, _, _ in parsed], dtype=np.float64)
+    width, height = size
+    # Normalisée ou en pixels : décidé boîte par boîte
+    normalized = np.abs(boxes).max(axis=1) <= 1.0 + NORMALIZED_OVERSHOOT
+    boxes[normalized] *= (width, height, width, height)
+    boxes[~normalized] *= max(width, height) / sent_edge
+    return boxes, [label for _, label, _ in parsed], [score for _, _, score in parsed]
+
+
+def render_overlay(image_bytes, detections, max_edge, quality=85):
+    """Aperçu JPEG (plus grand côté `max_edge`) avec les détections dessinées"""
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    with Image.open(open_buffer(image_bytes)) as image:
+        original_edge = max(image.size)
+        image.draft('RGB', (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.BILINEAR)
+        image = image.convert('RGB')
+    # Le backend a reçu l'image réduite par prepare_image (jamais agrandie)
+    sent_edge = min(config.IMAGE_MAX_EDGE, original_edge)
+    boxes, labels, scores = detection_boxes(detections, image.size, sent_edge)
+    pixels = draw_detections(np.asarray(image), boxes, labels, scores)
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format='JPEG', quality=quality)
+    return output.getvalue()
+
+
+@st.cache_data(max_entries=config.OVERLAY_CACHE_SIZE, show_spinner=False)
+def _cached_overlay(digest, _image_bytes, detections, max_edge):
+    # Clé : empreinte de l'image + détections du résultat (`_image_bytes` n'est pas haché)
+    return render_overlay(_image_bytes, detections, max_edge)
+
+
+def overlay(image_bytes, result, max_edge=None, digest=None):
+    """Aperçu annoté si le résultat contient des détections exploitables, sinon None"""
+    if not result or not parse_detections(result.get('detections')):
+        return None
+    return _cached_overlay(digest or content_hash(image_bytes), image_bytes, result['detections'],
+                           max_edge or config.THUMBNAIL_MAX_EDGE)
+
+
+def live_preview(image_bytes, result, max_edge=None):
+    """Aperçu d'une image du flux continu, réduit et annoté ; jamais mis en cache.
+
+    Chaque image du flux n'est affichée qu'une fois : en cache, elle
+    évincerait les aperçus des photos et des imports.
+    """
+    max_edge = max_edge or config.THUMBNAIL_MAX_EDGE
+    if result and parse_detections(result.get('detections')):
+        return render_overlay(image_bytes, result['detections'], max_edge)
+    return render_jpeg(image_bytes, max_edge)
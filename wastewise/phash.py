@@ -0,0 +1,103 @@
+"""Empreinte perceptuelle (dHash) pour reconnaître des images quasi identiques."""
+import threading
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.buffers import open_buffer
+
+HASH_SIZE = 8
+
+
+def dhash(image_bytes, hash_size=HASH_SIZE):
+    """dHash 64 bits : signe du gradient horizontal d'une vignette en niveaux de gris"""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(open_buffer(image_bytes)) as image:
+        image.draft('L', (hash_size * 4, hash_size * 4))
+        small = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class RecentHashIndex:
+    """Anneau des dernières empreintes d'une session et de leurs prédictions.
+
+    Chaque empreinte est rangée avec la portée du modèle qui a prédit
+    (`scope`) : une prédiction n'est réutilisée que pour le même modèle.
+    """
+
+    def __init__(self, size, threshold):
+        self.threshold = threshold
+        self.skipped = 0
+        self._hashes = [None] * size
+        self._scopes = [None] * size
+        self._results = [None] * size
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, image_hash, scope):
+        """Retourne la prédiction de l'empreinte la plus proche sous le seuil, ou None"""
+        import numpy as np
+
+        with self._lock:
+            filled = [i for i, h in enumerate(self._hashes) if h is not None and self._scopes[i] == scope]
+            if not filled:
+                return None
+            hashes = np.array([self._hashes[i] for i in filled], dtype=np.uint64)
+            xor = hashes ^ np.uint64(image_hash)
+            distances = np.unpackbits(xor.view(np.uint8)).reshape(len(filled), -1).sum(axis=1)
+            best = int(np.argmin(distances))
+            if distances[best] > self.threshold:
+                return None
+            self.skipped += 1
+            result = dict(self._results[filled[best]])
+        get_dedupe_stats().record_skip()
+        return result
+
+    def add(self, image_hash, scope, result):
+        with self._lock:
+            self._hashes[self._next] = image_hash
+            self._scopes[self._next] = scope
+            self._results[self._next] = dict(result)
+            self._next = (self._next + 1) % len(self._results)
+
+    def stats(self):
+        with self._lock:
+            return {'skipped': self.skipped}
+
+
+class DedupeStats:
+    """Appels backend évités par le dédoublonnage, toutes sessions confondues"""
+
+    def __init__(self):
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def stats(self):
+        with self._lock:
+            return {'skipped': self.skipped}
+
+
+@st.cache_resource
+def get_dedupe_stats():
+    return DedupeStats()
+
+
+def session_hash_index():
+    """Index de la session courante (thread de script), ou None si le dédoublonnage est désactivé.
+
+    Propre à la session : une prédiction n'est jamais réutilisée pour la
+    photo d'un autre utilisateur.
+    """
+    if config.PHASH_THRESHOLD <= 0:
+        return None
+    if 'hash_index' not in st.session_state:
+        st.session_state.hash_index = RecentHashIndex(config.PHASH_INDEX_SIZE, config.PHASH_THRESHOLD)
+    return st.session_state.hash_index
@@ -0,0 +1,201 @@
+"""Journal durable des prédictions dans SQLite (WAL), écrit en arrière-plan."""
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from wastewise import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    category TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    source TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    model_version TEXT NOT NULL
+);
+-- rowid (id) est ajouté implicitement à chaque index : (ts, id) et (category, ts, id)
+CREATE INDEX IF NOT EXISTS predictions_ts ON predictions (ts);
+CREATE INDEX IF NOT EXISTS predictions_category_ts ON predictions (category, ts);
+"""
+
+COLUMNS = ('ts', 'category', 'confidence', 'source', 'origin', 'digest', 'model_version')
+INSERT = f"INSERT INTO predictions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+# Parcours « loose index scan » : une recherche d'index par catégorie
+# distincte au lieu d'un parcours complet de la table
+CATEGORIES = """
+WITH RECURSIVE c(category) AS (
+    SELECT MIN(category) FROM predictions
+    UNION ALL
+    SELECT (SELECT MIN(category) FROM predictions WHERE category > c.category)
+    FROM c WHERE c.category IS NOT NULL
+)
+SELECT category FROM c WHERE category IS NOT NULL
+"""
+
+# Index couvrant (category, ts) : comptage sans lire la table
+COUNTS = "SELECT category, COUNT(*) FROM predictions GROUP BY category"
+RECENT_CONFIDENCES = "SELECT confidence FROM predictions ORDER BY ts DESC, id DESC LIMIT ?"
+
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class PredictionLog:
+    """File d'attente vidée par lots dans SQLite par un thread dédié.
+
+    `append` ne touche jamais le disque : le thread de script Streamlit
+    n'attend pas l'écriture. Si la file est pleine (disque bloqué), la
+    prédiction est abandonnée et comptée dans `dropped`.
+    """
+
+    def __init__(self, path, batch_size, flush_interval, max_queue):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with connect(path) as connection:
+            connection.executescript(SCHEMA)
+        connection.close()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='prediction-log')
+        self._thread.start()
+
+    def append(self, record):
+        """Ajoute un tuple dans l'ordre de COLUMNS ; non bloquant"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self):
+        connection = connect(self.path)
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                break
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    record = self._queue.get(timeout=max(0.0, remaining)) if remaining > 0 \
+                        else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            try:
+                with connection:
+                    connection.executemany(INSERT, batch)
+                written, dropped = len(batch), 0
+            except sqlite3.Error:
+                logger.exception("Écriture de %d prédictions impossible", len(batch))
+                written, dropped = 0, len(batch)
+            with self._lock:
+                self.written += written
+                self.dropped += dropped
+            if stop:
+                break
+        connection.close()
+
+    def close(self, timeout=5.0):
+        """Vide la file puis arrête le thread d'écriture"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {'written': self.written, 'dropped': self.dropped, 'pending': self._queue.qsize()}
+
+
+def page(path, before=None, category=None, limit=50):
+    """Une page de prédictions, des plus récentes aux plus anciennes.
+
+    Pagination par clé (`before` = (ts, id) de la dernière ligne de la page
+    précédente) : chaque page est une recherche dans l'index, quel que soit
+    son rang, au lieu d'un OFFSET qui parcourt toutes les lignes sautées.
+    """
+    if not os.path.exists(path):
+        return []
+    clauses, params = [], []
+    if category:
+        clauses.append("category = ?")
+        params.append(category)
+    if before is not None:
+        clauses.append("(ts, id) < (?, ?)")
+        params.extend(before)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = (f"SELECT id, {', '.join(COLUMNS)} FROM predictions {where} "
+             f"ORDER BY ts DESC, id DESC LIMIT ?")
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=10)
+    try:
+        return connection.execute(query, (*params, limit)).fetchall()
+    finally:
+        connection.close()
+
+
+def categories(path):
+    if not os.path.exists(path):
+        return []
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=10)
+    try:
+        return [row[0] for row in connection.execute(CATEGORIES)]
+    finally:
+        connection.close()
+
+
+def summary(path, recent):
+    """Comptes par catégorie et confiances des `recent` dernières prédictions"""
+    if not os.path.exists(path):
+        return {}, []
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=10)
+    try:
+        counts = dict(connection.execute(COUNTS).fetchall())
+        confidences = [row[0] for row in connection.execute(RECENT_CONFIDENCES, (recent,))]
+    finally:
+        connection.close()
+    # Du plus ancien au plus récent, dans l'ordre d'arrivée
+    confidences.reverse()
+    return counts, confidences
+
+
+@st.cache_resource
+def get_prediction_log():
+    """Journal partagé par les sessions, ou None si PREDICTION_LOG_PATH est vide"""
+    if not config.PREDICTION_LOG_PATH:
+        return None
+    log = PredictionLog(config.PREDICTION_LOG_PATH, config.PREDICTION_LOG_BATCH,
+                        config.PREDICTION_LOG_FLUSH_INTERVAL, config.PREDICTION_LOG_QUEUE)
+    atexit.register(log.close)
+    return log
+
+
+def log_prediction(result, origin, digest):
+    """Ajoute une prédiction au journal (si activé), sans attendre le disque"""
+    log = get_prediction_log()
+    if log is not None:
+        log.append((time.time(), result.get('category', 'Inconnu'), float(result.get('confidence', 0)),
+                    result.get('source', 'backend'), origin, digest, config.MODEL_VERSION))
@@ -0,0 +1,46 @@
+"""Réduction et ré-encodage des images avant envoi au backend."""
+import logging
+
+from wastewise import config
+from wastewise.buffers import ChunkWriter, open_buffer
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'WEBP': 'image/webp',
+}
+
+
+def prepare_image(image_bytes, max_edge=None, fmt=None, quality=None):
+    """Redresse, réduit et ré-encode une image.
+
+    Applique l'orientation EXIF, supprime les métadonnées, réduit le plus
+    grand côté à `max_edge` pixels puis ré-encode en JPEG ou WebP.
+    Accepte bytes ou memoryview, lus sans copie. Retourne un tuple
+    (ChunkWriter contenant l'image encodée, type MIME).
+    """
+    from PIL import Image, ImageOps
+
+    max_edge = max_edge or config.IMAGE_MAX_EDGE
+    fmt = (fmt or config.IMAGE_FORMAT).upper()
+    quality = quality or config.IMAGE_QUALITY
+    if fmt not in MIME_TYPES:
+        raise ValueError(f"Format d'image non supporté: {fmt}")
+
+    with Image.open(open_buffer(image_bytes)) as image:
+        # Décodage JPEG directement à l'échelle réduite (DCT scaling)
+        image.draft('RGB', (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        # EXIF, profil ICC, commentaires... ne sont pas ré-écrits
+        image.info.clear()
+
+        data = ChunkWriter()
+        image.save(data, format=fmt, quality=quality, optimize=True)
+
+    logger.info("Image prétraitée: %d -> %d octets (%s, %dpx max)",
+                len(image_bytes), len(data), fmt, max_edge)
+    return data, MIME_TYPES[fmt]
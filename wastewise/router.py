@@ -0,0 +1,212 @@
+"""Routage des appels entre plusieurs backends : latence, couverture, disjoncteur."""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.limiter import BackendOverloaded, is_backend_failure, new_limiter
+
+# Échantillons nécessaires avant de se fier au p95 mesuré d'un backend
+MIN_SAMPLES = 20
+
+
+class NoBackendAvailable(Exception):
+    """Tous les backends sont retirés de la rotation par leur disjoncteur"""
+
+
+def should_fail_over(exc):
+    """Vrai si un autre backend peut répondre : panne du backend ou refus de son limiteur"""
+    return isinstance(exc, BackendOverloaded) or is_backend_failure(exc)
+
+
+class Backend:
+    """État d'un backend : latence EWMA, latences récentes, disjoncteur.
+
+    Chaque backend a son propre limiteur de concurrence, pour qu'un backend
+    lent ou en panne ne réduise pas la limite des autres.
+    """
+
+    def __init__(self, name, base_uri, limiter=None, window=100):
+        self.name = name
+        self.base_uri = base_uri
+        self.limiter = limiter or new_limiter()
+        self.ewma = None
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.latencies = deque(maxlen=window)
+
+    def p95(self):
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def deadline(self):
+        """Délai de couverture : p95 mesuré, ou 2 x EWMA en attendant assez d'échantillons"""
+        p95 = self.p95()
+        if p95 is None and self.ewma is not None:
+            p95 = 2 * self.ewma
+        return p95
+
+
+class BackendRouter:
+    """Envoie chaque requête au backend sain le plus rapide (EWMA).
+
+    Si la réponse tarde au-delà du p95 de ce backend, une requête de
+    couverture part vers le suivant et la première réponse gagne ; un échec
+    du backend, ou un refus de son limiteur, bascule vers le suivant. Après
+    `failures` échecs consécutifs, le disjoncteur retire le backend pendant
+    `cooldown` secondes, puis une seule requête d'essai décide de sa
+    réintégration. Un refus du limiteur local n'a pas atteint le backend :
+    il ne compte ni comme échec ni comme succès.
+    """
+
+    def __init__(self, backends, alpha, hedge_delay, failures, cooldown, executor):
+        self.backends = backends
+        self.alpha = alpha
+        self.hedge_delay = hedge_delay
+        self.failures = failures
+        self.cooldown = cooldown
+        self._executor = executor
+        self._lock = threading.Lock()
+
+    def _state(self, backend, now):
+        if backend.opened_at is None:
+            return 'closed'
+        return 'half_open' if now - backend.opened_at >= self.cooldown else 'open'
+
+    def pick(self, exclude=()):
+        """Backend disponible le plus rapide ; les backends jamais mesurés d'abord"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [backend for backend in self.backends
+                          if backend not in exclude
+                          and (self._state(backend, now) == 'closed'
+                               or (self._state(backend, now) == 'half_open' and not backend.probing))]
+            if not candidates:
+                return None
+            backend = min(candidates, key=lambda b: -1.0 if b.ewma is None else b.ewma)
+            if backend.opened_at is not None:
+                backend.probing = True
+            return backend
+
+    def _record(self, backend, latency, failure):
+        with self._lock:
+            backend.requests += 1
+            backend.probing = False
+            if failure:
+                backend.errors += 1
+                backend.consecutive_failures += 1
+                if backend.opened_at is not None or backend.consecutive_failures >= self.failures:
+                    backend.opened_at = time.monotonic()
+                return
+            backend.consecutive_failures = 0
+            backend.opened_at = None
+            if latency is not None:
+                backend.latencies.append(latency)
+                backend.ewma = latency if backend.ewma is None else (
+                    self.alpha * latency + (1 - self.alpha) * backend.ewma)
+
+    def _run(self, backend, send):
+        start = time.perf_counter()
+        try:
+            result = send(backend)
+        except BackendOverloaded:
+            # Refus local : disjoncteur inchangé, l'essai éventuel sera refait
+            with self._lock:
+                backend.probing = False
+            raise
+        except Exception as exc:
+            self._record(backend, None, is_backend_failure(exc))
+            raise
+        self._record(backend, time.perf_counter() - start, False)
+        return result
+
+    def call(self, send):
+        """Exécute `send(backend)` sur le meilleur backend, avec couverture et bascule"""
+        primary = self.pick()
+        if primary is None:
+            raise NoBackendAvailable("Aucun backend disponible, réessayez dans un instant")
+        if not self.hedge_delay or len(self.backends) == 1:
+            return self._call_in_turn(primary, send)
+        with self._lock:
+            # Backend jamais mesuré (ou en essai) : on le borne au meilleur délai connu
+            delay = primary.deadline() or min([d for d in (b.deadline() for b in self.backends) if d]
+                                              + [self.hedge_delay])
+
+        futures = {self._executor.submit(self._run, primary, send): primary}
+        pending = set(futures)
+        hedge_at = time.monotonic() + delay
+        hedged = False
+        error = None
+        while pending:
+            timeout = None if hedged else max(0.0, hedge_at - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if futures[future] is not primary:
+                        with self._lock:
+                            futures[future].hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+            # Couverture (pas de réponse au p95) une seule fois ; bascule tant
+            # qu'il reste un backend non essayé
+            if (not done and not hedged) or (not pending and should_fail_over(error)):
+                hedged = True
+                secondary = self.pick(exclude=futures.values())
+                if secondary is not None:
+                    with self._lock:
+                        secondary.hedges += 1
+                    future = self._executor.submit(self._run, secondary, send)
+                    futures[future] = secondary
+                    pending.add(future)
+        raise error
+
+    def _call_in_turn(self, backend, send):
+        """Sans couverture : backends essayés l'un après l'autre tant que la bascule s'applique"""
+        tried = [backend]
+        while True:
+            try:
+                return self._run(backend, send)
+            except Exception as exc:
+                backend = self.pick(exclude=tried) if should_fail_over(exc) else None
+                if backend is None:
+                    raise
+                tried.append(backend)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'backend': backend.name,
+                'limit': backend.limiter.limit,
+                'state': self._state(backend, now),
+                'ewma_ms': round(backend.ewma * 1000, 1) if backend.ewma is not None else None,
+                'p95_ms': round(backend.p95() * 1000, 1) if backend.p95() is not None else None,
+                'requests': backend.requests,
+                'errors': backend.errors,
+                'hedges': backend.hedges,
+                'hedge_wins': backend.hedge_wins,
+            } for backend in self.backends]
+
+
+@st.cache_resource
+def get_router():
+    """Routeur partagé entre les backends de ROUTING_BACKENDS, ou None"""
+    if not config.ROUTING_BACKENDS:
+        return None
+    backends = []
+    for key in config.ROUTING_BACKENDS:
+        base_uri = st.secrets[key]
+        backends.append(Backend(key, base_uri if base_uri.endswith('/') else base_uri + '/'))
+    executor = ThreadPoolExecutor(max_workers=config.LIMITER_MAX_LIMIT, thread_name_prefix='router')
+    return BackendRouter(backends, config.ROUTING_EWMA_ALPHA, config.ROUTING_HEDGE_DELAY,
+                         config.BREAKER_FAILURES, config.BREAKER_COOLDOWN, executor)
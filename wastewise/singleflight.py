@@ -0,0 +1,54 @@
+"""Regroupement des appels identiques simultanés (« single flight »)."""
+import threading
+from concurrent.futures import Future
+
+import streamlit as st
+
+
+class SingleFlight:
+    """Un seul appel en vol par clé ; les appels concurrents attendent son résultat.
+
+    Le premier appelant pour une clé exécute la fonction ; ceux qui arrivent
+    pendant l'exécution reçoivent le même résultat (ou la même exception)
+    sans rien exécuter. La clé est libérée dès la fin de l'appel : les
+    suivants passent par le cache alimenté par le premier.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._in_flight)}
+
+
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
@@ -0,0 +1,145 @@
+"""Client en streaming de la route test_all du backend."""
+import codecs
+import json
+
+from wastewise.client import HTTP_TIMEOUT, get_http_session
+
+CHUNK_SIZE = 64 * 1024
+# Clés de l'objet racine sous lesquelles un document JSON range ses enregistrements
+RESULT_KEYS = ('results', 'records', 'predictions', 'data')
+
+_decoder = json.JSONDecoder()
+
+
+def _iter_ndjson(response):
+    for line in response.iter_lines(chunk_size=CHUNK_SIZE):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_json_array(response):
+    """Décode au fil de l'eau les enregistrements d'un document JSON.
+
+    Le tableau d'enregistrements est un tableau nu (`[...]`) ou la valeur
+    d'une clé de RESULT_KEYS de l'objet racine (`{"run": ..., "results":
+    [...]}`) ; les autres valeurs de l'objet sont décodées puis ignorées,
+    chaînes et tableaux compris. Seuls les éléments objets sont produits.
+    Seuls les octets non encore décodés restent en mémoire.
+    """
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    state = 'start'  # start -> (key -> colon -> value)* -> array
+    key = None  # clé en cours, lue dans l'état 'key'
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        buffer += text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            if state == 'array' and char in ',]':
+                if char == ']':
+                    return
+                pos += 1
+                continue
+            if state == 'start':
+                if char not in '[{':
+                    return
+                state = 'array' if char == '[' else 'key'
+                pos += 1
+                continue
+            if state == 'key' and char in ',}':
+                if char == '}':
+                    return  # pas de tableau d'enregistrements
+                pos += 1
+                continue
+            if state == 'colon':
+                if char != ':':
+                    return
+                state = 'value'
+                pos += 1
+                continue
+            if state == 'value' and char == '[' and key in RESULT_KEYS:
+                state = 'array'
+                pos += 1
+                continue
+
+            # Clé, valeur ignorée ou élément du tableau : une valeur JSON complète
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break  # valeur incomplète : attendre le chunk suivant
+            if end == len(buffer):
+                break  # un nombre peut continuer dans le chunk suivant
+            pos = end
+            if state == 'key':
+                key, state = value, 'colon'
+            elif state == 'value':
+                state = 'key'
+            elif isinstance(value, dict):
+                yield value
+        buffer = buffer[pos:]
+
+
+def stream_test_all(url):
+    """Génère les enregistrements de test_all au fur et à mesure de leur arrivée.
+
+    Accepte une réponse NDJSON ou un document JSON envoyé en chunks. Le
+    premier élément produit est le nombre total d'enregistrements annoncé
+    par l'en-tête `X-Total-Count` (ou None). La connexion est libérée dès
+    que le générateur est fermé, ce qui permet d'annuler un run.
+    """
+    response = get_http_session().get(
+        url,
+        headers={'Accept': 'application/x-ndjson, application/json'},
+        stream=True,
+        timeout=HTTP_TIMEOUT
+    )
+    with response:
+        response.raise_for_status()
+        total = response.headers.get('X-Total-Count')
+        yield int(total) if total else None
+
+        content_type = response.headers.get('Content-Type', '')
+        if 'ndjson' in content_type or 'jsonl' in content_type:
+            yield from _iter_ndjson(response)
+        else:
+            yield from _iter_json_array(response)
+
+
+def record_outcome(record):
+    """Extrait (label attendu, label prédit, confiance) d'un enregistrement"""
+    expected = record.get('true_label', record.get('label'))
+    predicted = record.get('predicted', record.get('prediction', record.get('category')))
+    return expected, predicted, float(record.get('confidence', 0))
+
+
+class TestAllTotals:
+    """Totaux courants d'un run test_all, en mémoire constante"""
+
+    __test__ = False  # pas une classe de test pour pytest, malgré son nom
+
+    def __init__(self):
+        self.count = 0
+        self.labelled = 0
+        self.correct = 0
+        self.confidence_sum = 0.0
+
+    def add(self, record):
+        expected, predicted, confidence = record_outcome(record)
+        self.count += 1
+        self.confidence_sum += confidence
+        if expected is not None:
+            self.labelled += 1
+            if record.get('correct', expected == predicted):
+                self.correct += 1
+
+    @property
+    def accuracy(self):
+        return self.correct / self.labelled if self.labelled else None
+
+    @property
+    def mean_confidence(self):
+        return self.confidence_sum / self.count if self.count else None
@@ -0,0 +1,80 @@
+"""Aperçus redimensionnés des images, mis en cache par empreinte de contenu."""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.buffers import open_buffer
+
+
+def content_hash(image_bytes):
+    """Empreinte SHA-256 du contenu de l'image"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def render_jpeg(image_bytes, max_edge, quality=80):
+    """Image redressée et réduite à `max_edge` px, en JPEG"""
+    from PIL import Image, ImageOps
+
+    with Image.open(open_buffer(image_bytes)) as image:
+        image.draft('RGB', (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=quality)
+    return output.getvalue()
+
+
+@st.cache_data(max_entries=config.THUMBNAIL_CACHE_SIZE, show_spinner=False)
+def _render_thumbnail(digest, _image_bytes, max_edge):
+    # `_image_bytes` n'est pas haché par Streamlit : la clé est `digest`
+    return render_jpeg(_image_bytes, max_edge)
+
+
+def thumbnail(image_bytes, max_edge=None, digest=None):
+    """Retourne un aperçu JPEG de taille d'affichage, calculé une fois par image"""
+    return _render_thumbnail(digest or content_hash(image_bytes), image_bytes,
+                             max_edge or config.THUMBNAIL_MAX_EDGE)
+
+
+class IconStore:
+    """Vignettes de l'historique, partagées par les sessions.
+
+    Référencées par empreinte de contenu et bornées en LRU : leur mémoire
+    ne dépend pas du nombre de sessions.
+    """
+
+    def __init__(self, max_entries, max_edge):
+        self.max_entries = max_entries
+        self.max_edge = max_edge
+        self._icons = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, digest, image_bytes):
+        with self._lock:
+            if digest in self._icons:
+                self._icons.move_to_end(digest)
+                return
+        icon = render_jpeg(image_bytes, self.max_edge, quality=70)
+        with self._lock:
+            self._icons[digest] = icon
+            while len(self._icons) > self.max_entries:
+                self._icons.popitem(last=False)
+
+    def get(self, digest):
+        with self._lock:
+            return self._icons.get(digest)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._icons), 'bytes': sum(map(len, self._icons.values()))}
+
+
+@st.cache_resource
+def get_icon_store():
+    return IconStore(config.HISTORY_THUMBNAIL_CACHE, config.HISTORY_THUMBNAIL_EDGE)
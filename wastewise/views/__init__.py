@@ -0,0 +1,43 @@
+"""Pages de l'app, une par module, importées seulement quand elles sont affichées.
+
+Le dossier n'est pas `pages/` : Streamlit y chercherait des scripts
+autonomes et ajouterait sa propre navigation.
+"""
+import importlib
+
+import streamlit as st
+
+# Clé de route (`?page=`) -> (icône, libellé) ; module wastewise.views.<clé>
+PAGES = {
+    'detection': ('📸', 'Détection en Direct'),
+    'upload': ('🖼️', 'Analyser une Image'),
+    'history': ('🗂️', 'Historique'),
+    'about': ('💡', 'À Propos'),
+}
+DEFAULT_PAGE = 'detection'
+
+
+def resolve_page():
+    """Page active d'après `?page=`, lue avant tout rendu.
+
+    Sans paramètre valide, la dernière page de la session (ou la page par
+    défaut) est reprise et écrite dans l'URL, qui reste ainsi partageable.
+    """
+    requested = st.query_params.get('page')
+    page = requested if requested in PAGES else st.session_state.get('current_page')
+    if page not in PAGES:
+        page = DEFAULT_PAGE
+    st.session_state.current_page = page
+    if requested != page:
+        st.query_params['page'] = page
+    return page
+
+
+def navigate(page):
+    """Callback des boutons de navigation : la route est lue au rerun qui suit"""
+    st.query_params['page'] = page
+
+
+def render_page(page):
+    """Importe (une fois par process) puis affiche le module de la page"""
+    importlib.import_module(f'{__name__}.{page}').render()
@@ -0,0 +1,71 @@
+"""Page « À propos » : présentation et statistiques d'impact."""
+import html
+
+import streamlit as st
+
+from wastewise.impact import get_impact_stats
+
+
+def render():
+    st.markdown("<div style='margin: 0 50px;'>", unsafe_allow_html=True)
+    st.markdown("<h1 class='fade-in'>💡 À Propos de WasteWise</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='subheader-text'>Intelligence artificielle au service de l'environnement</p>", unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2, gap="large")
+
+    with col1:
+        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+        st.markdown("""
+        <h3>🎯 Notre Mission</h3>
+        <p>WasteWise utilise l'intelligence artificielle pour faciliter le tri des déchets et promouvoir le recyclage.
+        Notre objectif est de rendre le geste de tri accessible à tous grâce à la technologie.</p>
+
+        <h3 style='margin-top: 30px;'>🤖 La Technologie</h3>
+        <p>Notre modèle d'IA est entraîné sur des milliers d'images de déchets pour classifier avec précision:</p>
+        <ul>
+            <li>♻️ Plastique</li>
+            <li>📄 Papier et carton</li>
+            <li>🥫 Métaux</li>
+            <li>🍶 Verre</li>
+            <li>🗑️ Déchets organiques</li>
+        </ul>
+        """, unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+        st.markdown(impact_html(get_impact_stats().snapshot()), unsafe_allow_html=True)
+        st.markdown("""
+        <h3>🌍 Contribuez au Changement</h3>
+        <p>Chaque déchet correctement trié contribue à un avenir plus durable.
+        Utilisez WasteWise pour devenir un acteur du changement!</p>
+        """, unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+def impact_html(stats):
+    """Chiffres d'impact à partir des agrégats courants (aucun parcours du journal)"""
+    evaluation = stats['evaluation']
+    confidence = stats['mean_confidence']
+    figures = [
+        (f"{stats['total']:,}", "Images analysées"),
+        (f"{evaluation['accuracy'] * 100:.1f}%" if evaluation else "–",
+         f"Précision (test_all, {evaluation['count']:,} images)" if evaluation else "Précision (lancez test_all)"),
+        (f"{confidence * 100:.1f}%" if confidence is not None else "–", "Confiance moyenne récente"),
+        (f"{len(stats['by_category'])}", "Catégories de déchets"),
+    ]
+    blocks = ''.join(f"""
+            <div style='text-align: center; margin: 15px 0;'>
+                <div style='font-size: 36px; font-weight: 700; color: #2E7D32;'>{value}</div>
+                <div style='color: #555;'>{label}</div>
+            </div>""" for value, label in figures)
+    counts = ''.join(f"<li>{html.escape(str(category))} : {count:,}</li>"
+                     for category, count in sorted(stats['by_category'].items(), key=lambda item: -item[1]))
+    return f"""
+        <h3>📈 Impact Environnemental</h3>
+        <div style='background: linear-gradient(135deg, #E8F5E9 0%, #C8E6C9 100%); padding: 20px; border-radius: 15px; margin: 20px 0;'>{blocks}
+        </div>
+        {f"<ul>{counts}</ul>" if counts else ""}
+        """
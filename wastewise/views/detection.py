@@ -0,0 +1,157 @@
+"""Page « Détection en direct » : photo ponctuelle ou flux caméra continu."""
+import time
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.live import LiveSession, grab_frame
+from wastewise.metrics import get_metrics
+from wastewise.overlay import live_preview
+from wastewise.views.shared import (api_url, poll_prediction, prediction_pending, preview, render_history,
+                                    reset_prediction, settle_prediction, submit_prediction)
+
+
+def render():
+    st.markdown("<div style='margin: 0 50px;'>", unsafe_allow_html=True)
+    st.markdown("<h1 class='fade-in'>📸 Détection en Direct</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='subheader-text'>Utilisez votre caméra pour classifier vos déchets instantanément</p>", unsafe_allow_html=True)
+
+    live_mode = st.toggle(
+        "🎥 Mode continu (caméra du poste)", key="live_mode",
+        disabled=not config.LIVE_CAMERA_URL,
+        help="Nécessite LIVE_CAMERA_URL" if not config.LIVE_CAMERA_URL else None
+    )
+    if live_mode:
+        live_detection()
+        st.markdown("</div>", unsafe_allow_html=True)
+        return
+    if 'live_session' in st.session_state:
+        st.session_state.live_session.stop()
+        del st.session_state.live_session
+
+    detection_panel()
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+@st.fragment
+def detection_panel():
+    """Colonnes capture / résultat, rerun sans réexécuter le reste de l'app"""
+    settle_prediction()
+    col1, col2 = st.columns([1.2, 1], gap="large")
+
+    with col1:
+        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+
+        # Capture caméra
+        camera_photo = st.camera_input("📷 Prendre une photo", key="camera_detection")
+
+        if camera_photo:
+            image_bytes = camera_photo.getvalue()
+            st.image(preview(image_bytes), use_container_width=True, caption="Photo capturée")
+
+            if st.button("🔍 Analyser cette image", use_container_width=True):
+                # Photos successives du même objet : prédiction réutilisée.
+                # La colonne résultat, rendue après, suit l'avancement
+                submit_prediction(image_bytes, dedupe=True, origin='camera')
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        detection_result()
+
+    poll_prediction()
+
+
+@st.fragment
+def detection_result():
+    """Carte de résultat : « Nouvelle analyse » ne rerun que cette carte"""
+    st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+
+    if prediction_pending():
+        render_history()
+    elif st.session_state.prediction_result:
+        render_start = time.perf_counter()
+        result = st.session_state.prediction_result
+
+        st.markdown("<h3>✅ Résultat de l'analyse</h3>", unsafe_allow_html=True)
+
+        category = result.get('category', 'Inconnu')
+        confidence = float(result.get('confidence', 0))
+
+        st.markdown(f"<h2>{category.upper()} ♻️</h2>", unsafe_allow_html=True)
+        st.markdown(f"<div class='confidence-badge'>{confidence*100:.2f}%</div>", unsafe_allow_html=True)
+
+        st.progress(confidence)
+        st.caption("Niveau de confiance")
+
+        if 'description' in result:
+            st.info(f"ℹ️ {result['description']}")
+
+        if 'recycling_tips' in result:
+            st.success(f"♻️ **Conseil de tri:** {result['recycling_tips']}")
+
+        if result.get('source') == 'local':
+            st.caption("🖥️ Prédiction calculée sur ce poste (modèle local)")
+
+        st.button("🔄 Nouvelle analyse", use_container_width=True, on_click=reset_prediction)
+        render_history()
+        get_metrics().observe('wastewise_render_seconds', time.perf_counter() - render_start, view='detection')
+    else:
+        st.info("👆 Prenez une photo pour commencer l'analyse")
+        st.markdown("""
+        <div style='padding: 20px; background: #F1F8F4; border-radius: 15px; margin-top: 20px;'>
+            <h4 style='color: #2E7D32; margin-bottom: 10px;'>💡 Conseils pour de meilleurs résultats:</h4>
+            <ul style='color: #555;'>
+                <li>Assurez un bon éclairage</li>
+                <li>Centrez le déchet dans le cadre</li>
+                <li>Évitez les reflets et ombres</li>
+                <li>Photographiez un seul objet à la fois</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        render_history()
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+@st.fragment(run_every=1 / config.LIVE_FPS)
+def live_detection():
+    """Échantillonne la caméra du poste et met à jour le résultat en place"""
+    if 'live_session' not in st.session_state:
+        st.session_state.live_session = LiveSession()
+    live = st.session_state.live_session
+
+    try:
+        live.submit(grab_frame(config.LIVE_CAMERA_URL), api_url())
+    except Exception as e:
+        st.warning(f"Caméra indisponible: {e}")
+
+    col1, col2 = st.columns([1.2, 1], gap="large")
+
+    with col1:
+        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+        if live.last_frame:
+            # Boîtes de la dernière classification sur l'image la plus récente
+            st.image(live_preview(live.last_frame, live.last_result), use_container_width=True,
+                     caption="Flux caméra")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+        result = live.last_result
+        if result:
+            category = result.get('category', 'Inconnu')
+            confidence = float(result.get('confidence', 0))
+            st.markdown(f"<h2>{category.upper()} ♻️</h2>", unsafe_allow_html=True)
+            st.markdown(f"<div class='confidence-badge'>{confidence*100:.2f}%</div>", unsafe_allow_html=True)
+            st.progress(confidence)
+        elif live.last_error:
+            st.error(f"Erreur lors de la prédiction: {live.last_error}")
+        else:
+            st.info("⏳ En attente de la première classification...")
+
+        col_fps, col_latency, col_dropped = st.columns(3)
+        col_fps.metric("Images/s", f"{live.fps:.1f}")
+        col_latency.metric("Latence", f"{live.last_latency * 1000:.0f} ms" if live.last_latency else "–")
+        col_dropped.metric("Ignorées", f"{live.frames_dropped}/{live.frames_sampled}")
+        st.markdown("</div>", unsafe_allow_html=True)
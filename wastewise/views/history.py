@@ -0,0 +1,71 @@
+"""Page « Historique » : journal SQLite des prédictions, paginé par clé."""
+import time
+
+import streamlit as st
+
+from wastewise import config
+from wastewise.prediction_log import categories, page
+from wastewise.views.shared import HISTORY_ORIGINS
+
+
+def render():
+    st.markdown("<div style='margin: 0 50px;'>", unsafe_allow_html=True)
+    st.markdown("<h1 class='fade-in'>🗂️ Historique des Prédictions</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='subheader-text'>Toutes les analyses enregistrées par ce poste</p>", unsafe_allow_html=True)
+
+    if config.PREDICTION_LOG_PATH:
+        history_table()
+    else:
+        st.info("ℹ️ Journal des prédictions désactivé (PREDICTION_LOG_PATH vide).")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+def reset_history_pages():
+    st.session_state.history_cursors = [None]
+
+
+def history_older(cursor):
+    st.session_state.history_cursors.append(cursor)
+
+
+def history_newer():
+    st.session_state.history_cursors.pop()
+
+
+@st.fragment
+def history_table():
+    """Une page du journal (pagination par clé) ; les boutons ne rerun que ce tableau"""
+    path = config.PREDICTION_LOG_PATH
+    size = config.HISTORY_PAGE_SIZE
+    if 'history_cursors' not in st.session_state:
+        reset_history_pages()
+    cursors = st.session_state.history_cursors
+
+    category = st.selectbox("Catégorie", ['Toutes'] + categories(path), key="history_category",
+                            on_change=reset_history_pages)
+    # Une ligne de plus que la page pour savoir s'il existe une page suivante
+    rows = page(path, before=cursors[-1], category=None if category == 'Toutes' else category,
+                limit=size + 1)
+    has_older = len(rows) > size
+    rows = rows[:size]
+
+    if rows:
+        st.dataframe([{
+            'Date': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts)),
+            'Catégorie': row_category,
+            'Confiance (%)': round(confidence * 100, 1),
+            'Origine': HISTORY_ORIGINS.get(origin, origin),
+            'Source': source,
+            'Modèle': model_version,
+        } for _, ts, row_category, confidence, source, origin, _, model_version in rows],
+            use_container_width=True, hide_index=True)
+    else:
+        st.info("📭 Aucune prédiction enregistrée pour l'instant.")
+
+    col1, col2, col3 = st.columns([1, 2, 1], vertical_alignment="center")
+    col1.button("⬅️ Plus récentes", use_container_width=True, disabled=len(cursors) == 1,
+                on_click=history_newer)
+    col2.caption(f"Page {len(cursors)} · {size} prédictions par page")
+    col3.button("Plus anciennes ➡️", use_container_width=True, disabled=not has_older,
+                on_click=history_older, args=((rows[-1][1], rows[-1][0]) if rows else None,))
@@ -0,0 +1,162 @@
+"""Éléments communs aux pages : analyse en arrière-plan, résultat, historique."""
+import time
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from wastewise import config
+from wastewise.api import get_base_uri
+from wastewise.background import BackgroundPrediction
+from wastewise.history import clear_history, record_analysis, session_entries
+from wastewise.impact import get_impact_stats
+from wastewise.overlay import overlay
+from wastewise.phash import session_hash_index
+from wastewise.prediction_log import log_prediction
+from wastewise.thumbnails import content_hash, get_icon_store, thumbnail
+
+
+def api_url(endpoint='detect'):
+    """URL d'un endpoint du backend choisi par API_URI"""
+    return get_base_uri() + endpoint
+
+
+# --------------------------------------------------------
+# ANALYSE EN ARRIÈRE-PLAN
+# --------------------------------------------------------
+def submit_prediction(image_bytes, dedupe=False, origin='upload'):
+    """Lance l'analyse en arrière-plan ; celle encore en cours est abandonnée.
+
+    Avec `dedupe`, l'index dHash de la session est passé à detect().
+    """
+    cancel_prediction()
+    hash_index = session_hash_index() if dedupe else None
+    st.session_state.prediction_result = None
+    st.session_state.prediction_digest = None
+    st.session_state.pending_prediction = BackgroundPrediction(image_bytes, api_url(), hash_index, origin)
+
+
+def cancel_prediction():
+    pending = st.session_state.pop('pending_prediction', None)
+    if pending is not None:
+        pending.cancel()
+    st.session_state.pop('prediction_error', None)
+
+
+def collect_prediction():
+    """Récupère le résultat de l'analyse en cours si elle est terminée"""
+    pending = st.session_state.get('pending_prediction')
+    if pending is None or not pending.done:
+        return False
+    del st.session_state.pending_prediction
+    result, error, _ = pending.outcome()
+    if error is not None:
+        st.session_state.prediction_error = str(error)
+    else:
+        st.session_state.prediction_digest = record_result(pending.image_bytes, result, pending.origin)
+        st.session_state.prediction_result = result
+    return True
+
+
+def record_result(image_bytes, result, origin):
+    """Historique de session, agrégats d'impact et journal SQLite ; retourne l'empreinte de l'image"""
+    digest = content_hash(image_bytes)
+    record_analysis(image_bytes, result, origin, digest)
+    # Agrégats avant le journal : ils sont repris de la base au premier appel
+    get_impact_stats().record(result)
+    log_prediction(result, origin, digest)
+    return digest
+
+
+def reset_prediction():
+    """Efface le résultat courant (callback des boutons « Nouvelle ... »)"""
+    cancel_prediction()
+    st.session_state.prediction_result = None
+    st.session_state.prediction_digest = None
+
+
+def preview(image_bytes):
+    """Aperçu de l'image, annoté des détections si le résultat courant la concerne"""
+    digest = content_hash(image_bytes)
+    if st.session_state.get('prediction_digest') == digest:
+        annotated = overlay(image_bytes, st.session_state.get('prediction_result'), digest=digest)
+        if annotated is not None:
+            return annotated
+    return thumbnail(image_bytes, digest=digest)
+
+
+def prediction_pending():
+    """Vrai si une analyse est en cours, dont l'avancement est alors affiché"""
+    collect_prediction()
+    pending = st.session_state.get('pending_prediction')
+    if pending is None:
+        error = st.session_state.pop('prediction_error', None)
+        if error:
+            st.error(f"Erreur lors de la prédiction: {error}")
+        return False
+    st.info(f"🔄 Analyse en cours... {pending.elapsed:.1f} s")
+    st.button("⏹️ Annuler l'analyse", use_container_width=True, on_click=cancel_prediction)
+    return True
+
+
+def settle_prediction():
+    """Attend au plus PREDICTION_POLL_INTERVAL l'analyse en cours puis récupère son résultat.
+
+    Appelée en tête de panneau : l'aperçu, rendu ensuite, est annoté dès le
+    run qui récupère le résultat.
+    """
+    pending = st.session_state.get('pending_prediction')
+    if pending is not None:
+        pending.wait(config.PREDICTION_POLL_INTERVAL)
+    collect_prediction()
+
+
+def poll_prediction():
+    """Relance le panneau appelant tant qu'une analyse est en cours.
+
+    Seul le panneau est relancé (`scope="fragment"`), et plus rien ne l'est
+    une fois le résultat affiché ; le minuteur d'un `run_every` tournerait
+    lui jusqu'au rerun complet suivant. Pendant un run complet de l'app, un
+    rerun partiel est refusé : `prediction_progress` prend le relais.
+    """
+    if 'pending_prediction' not in st.session_state:
+        return
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        prediction_progress()
+
+
+@st.fragment(run_every=config.PREDICTION_POLL_INTERVAL)
+def prediction_progress():
+    """Relais de `poll_prediction` rendu par un run complet : relance l'app à la fin de l'analyse"""
+    if 'pending_prediction' not in st.session_state or collect_prediction():
+        st.rerun()
+
+
+# --------------------------------------------------------
+# HISTORIQUE DE LA SESSION
+# --------------------------------------------------------
+HISTORY_ORIGINS = {'camera': '📷 caméra', 'upload': '📤 import', 'batch': '🗂️ lot'}
+
+
+def render_history():
+    """Dernières analyses de la session : vignettes partagées, jamais l'image d'origine"""
+    entries = session_entries()
+    if not entries:
+        return
+    icons = get_icon_store()
+    with st.expander(f"🕘 Historique ({len(entries)})"):
+        for entry in entries:
+            col1, col2 = st.columns([1, 4], vertical_alignment="center")
+            icon = icons.get(entry.digest)
+            if icon is not None:
+                col1.image(icon)
+            else:
+                col1.markdown("🖼️")
+            details = [time.strftime('%H:%M:%S', time.localtime(entry.timestamp)),
+                       HISTORY_ORIGINS.get(entry.origin, entry.origin)]
+            if entry.source == 'local':
+                details.append('🖥️ modèle local')
+            col2.markdown(f"**{entry.category.upper()}** — {entry.confidence * 100:.1f}%  \n"
+                          f"<small>{' · '.join(details)}</small>", unsafe_allow_html=True)
+        st.button("🗑️ Effacer l'historique", use_container_width=True, on_click=clear_history)
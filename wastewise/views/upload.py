@@ -0,0 +1,261 @@
+"""Page « Analyser une image » : import simple ou par lot, et run test_all."""
+import time
+from contextlib import closing
+
+import streamlit as st
+
+from wastewise.batch import run_batch
+from wastewise.impact import get_impact_stats
+from wastewise.metrics import get_metrics
+from wastewise.test_all import TestAllTotals, stream_test_all
+from wastewise.views.shared import (api_url, poll_prediction, prediction_pending, preview, record_result,
+                                    render_history, reset_prediction, settle_prediction, submit_prediction)
+
+
+def render():
+    st.markdown("<div style='margin: 0 50px;'>", unsafe_allow_html=True)
+    st.markdown("<h1 class='fade-in'>🖼️ Analyser une Image</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='subheader-text'>Téléversez une image pour obtenir une analyse du déchet</p>", unsafe_allow_html=True)
+
+    upload_panel()
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+@st.fragment
+def upload_panel():
+    """Colonnes import / résultat et section test_all, rerun sans réexécuter le reste de l'app"""
+    settle_prediction()
+    col1, col2 = st.columns([1.2, 1], gap="large")
+    batch_area = st.container()
+    dashboard_area = st.container()
+
+    # --- LEFT SIDE : UPLOAD IMAGE ---
+    with col1:
+        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+        batch_mode = st.toggle("📚 Mode lot (plusieurs images)", key="batch_mode")
+
+        if batch_mode:
+            uploaded_images = st.file_uploader(
+                "📤 Importer des images", type=["jpg", "jpeg", "png"],
+                accept_multiple_files=True, key="batch_uploader"
+            )
+            if uploaded_images and st.button(f"🔍 Analyser les {len(uploaded_images)} images", use_container_width=True):
+                with batch_area:
+                    analyse_batch(uploaded_images)
+            elif st.session_state.get('batch_results'):
+                with batch_area:
+                    st.dataframe(st.session_state.batch_results, use_container_width=True, hide_index=True)
+
+        uploaded_image = None if batch_mode else st.file_uploader("📤 Importer une image", type=["jpg", "jpeg", "png"])
+
+        if uploaded_image:
+            # getvalue() partage les octets reçus par Streamlit (read() dépend
+            # de la position, getbuffer() copierait) : aucune copie jusqu'au backend
+            image_bytes = uploaded_image.getvalue()
+            st.image(preview(image_bytes), use_container_width=True, caption="Image importée")
+
+            if st.button("🔍 Analyser cette image", use_container_width=True):
+                # La colonne résultat, rendue après, suit l'avancement
+                submit_prediction(image_bytes)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # --- RIGHT SIDE : RESULTS ---
+    with col2:
+        upload_result()
+
+        # --------------------------------------------------
+        # ⭐ NEW: test_all section
+        # --------------------------------------------------
+        st.markdown("### 🔍 Tester le dataset complet (Backend)")
+
+        col_run, col_cancel = st.columns(2)
+        # Un clic sur "Annuler" relance le script, ce qui interrompt le run en cours
+        cancel = col_cancel.button("⏹️ Annuler", use_container_width=True, key="cancel_test_all")
+        if st.session_state.get('test_all_running'):
+            st.session_state.test_all_running = False
+            if cancel:
+                st.warning("test_all annulé.")
+        if col_run.button("🚀 Lancer test_all", use_container_width=True):
+            run_test_all()
+
+        if st.session_state.get('test_all_report'):
+            with dashboard_area:
+                render_test_all_dashboard(st.session_state.test_all_report)
+
+        # --------------------------------------------------
+
+    poll_prediction()
+
+
+@st.fragment
+def upload_result():
+    """Carte de résultat : « Nouvelle image » ne rerun que cette carte"""
+    st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+
+    if prediction_pending():
+        render_history()
+    elif st.session_state.prediction_result:
+        render_start = time.perf_counter()
+        result = st.session_state.prediction_result
+
+        st.markdown("<h3>✅ Résultat de l'analyse</h3>", unsafe_allow_html=True)
+
+        category = result.get('category', 'Inconnu')
+        confidence = float(result.get('confidence', 0))
+
+        st.markdown(f"<h2>{category.upper()} ♻️</h2>", unsafe_allow_html=True)
+        st.markdown(f"<div class='confidence-badge'>{confidence*100:.2f}%</div>", unsafe_allow_html=True)
+
+        st.progress(confidence)
+
+        if 'description' in result:
+            st.info(f"ℹ️ {result['description']}")
+
+        if 'recycling_tips' in result:
+            st.success(f"♻️ Conseil: {result['recycling_tips']}")
+
+        if result.get('source') == 'local':
+            st.caption("🖥️ Prédiction calculée sur ce poste (modèle local)")
+
+        st.button("🔄 Nouvelle image", use_container_width=True, on_click=reset_prediction)
+        render_history()
+        get_metrics().observe('wastewise_render_seconds', time.perf_counter() - render_start, view='upload')
+
+    else:
+        st.info("📥 Importez une image pour commencer.")
+        render_history()
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+# --------------------------------------------------------
+# MODE LOT
+# --------------------------------------------------------
+def analyse_batch(uploaded_images):
+    """Analyse un lot d'images en parallèle et remplit le tableau au fil de l'eau"""
+    images = [(f.name, f.getvalue()) for f in uploaded_images]
+    rows = [
+        {'Image': name, 'Statut': '⏳ En attente', 'Catégorie': '', 'Confiance': None, 'Latence (ms)': None}
+        for name, _ in images
+    ]
+
+    progress = st.progress(0.0, text="🔄 Analyse du lot en cours...")
+    table = st.empty()
+    table.dataframe(rows, use_container_width=True, hide_index=True)
+
+    start = time.perf_counter()
+    # closing : un rerun qui interrompt le lot annule aussitôt les images restantes
+    with closing(run_batch(images, api_url())) as outcomes:
+        for done, (index, result, error, latency) in enumerate(outcomes, 1):
+            row = rows[index]
+            row['Latence (ms)'] = round(latency * 1000)
+            if error is None:
+                row['Statut'] = '✅ OK'
+                row['Catégorie'] = result.get('category', 'Inconnu')
+                row['Confiance'] = round(float(result.get('confidence', 0)) * 100, 2)
+                record_result(images[index][1], result, 'batch')
+            else:
+                row['Statut'] = f'❌ {error}'
+            table.dataframe(rows, use_container_width=True, hide_index=True)
+            progress.progress(done / len(rows), text=f"🔄 {done}/{len(rows)} images analysées")
+
+    elapsed = time.perf_counter() - start
+    progress.progress(1.0, text=f"✅ {len(rows)} images en {elapsed:.1f}s ({len(rows) / elapsed:.1f} img/s)")
+    st.session_state.batch_results = rows
+
+# --------------------------------------------------------
+# TEST_ALL EN STREAMING
+# --------------------------------------------------------
+def run_test_all():
+    """Consomme test_all en streaming en mettant à jour progression et totaux"""
+    progress = st.progress(0.0, text="📡 Connexion au backend...")
+    summary = st.empty()
+    # NumPy n'est chargé que lorsqu'un run test_all est lancé
+    from wastewise.evaluation import EvaluationColumns, evaluation_report
+
+    totals = TestAllTotals()
+    columns = EvaluationColumns()
+    st.session_state.test_all_running = True
+
+    def refresh(total):
+        if total:
+            progress.progress(min(totals.count / total, 1.0), text=f"📡 {totals.count}/{total} images")
+        else:
+            progress.progress(0.0, text=f"📡 {totals.count} images")
+        accuracy = f"{totals.accuracy * 100:.1f}%" if totals.accuracy is not None else "–"
+        confidence = f"{totals.mean_confidence * 100:.1f}%" if totals.mean_confidence is not None else "–"
+        summary.markdown(f"**Images:** {totals.count} · **Précision:** {accuracy} · **Confiance moyenne:** {confidence}")
+
+    try:
+        with closing(stream_test_all(api_url('test_all'))) as records:
+            total = next(records)
+            last_refresh = 0.0
+            for record in records:
+                totals.add(record)
+                columns.add(record)
+                # Limite les mises à jour envoyées au navigateur
+                now = time.monotonic()
+                if now - last_refresh > 0.2:
+                    refresh(total)
+                    last_refresh = now
+    except Exception as e:
+        st.session_state.test_all_running = False
+        st.error(f"Erreur lors du test_all: {e}")
+        return None
+
+    st.session_state.test_all_running = False
+    refresh(totals.count)
+    st.success("Test dataset terminé !")
+    # Calculé une seule fois : les reruns suivants ne font que l'afficher
+    st.session_state.test_all_report = evaluation_report(columns) if len(columns) else None
+    if totals.accuracy is not None:
+        get_impact_stats().record_evaluation(totals.accuracy, totals.count)
+    return totals
+
+
+def render_test_all_dashboard(report):
+    """Affiche les métriques d'évaluation de test_all sous forme de tableaux et graphiques"""
+    classes = report['classes']
+
+    st.markdown("<h3>📊 Évaluation du modèle (test_all)</h3>", unsafe_allow_html=True)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Images évaluées", f"{report['count']:,}")
+    col2.metric("Précision globale", f"{report['accuracy'] * 100:.1f}%")
+    col3.metric("F1 macro", f"{report['macro_f1']:.3f}")
+    col4.metric("Erreur de calibration (ECE)", f"{report['ece']:.3f}")
+
+    col1, col2 = st.columns(2, gap="large")
+    with col1:
+        st.caption("Métriques par classe")
+        st.dataframe({
+            'Classe': classes,
+            'Précision': report['precision'].round(3),
+            'Rappel': report['recall'].round(3),
+            'F1': report['f1'].round(3),
+            'Support': report['support'],
+        }, use_container_width=True, hide_index=True)
+
+        st.caption("Matrice de confusion (lignes : réel, colonnes : prédit)")
+        cm = report['confusion_matrix']
+        st.dataframe(
+            {'Réel \\ Prédit': classes, **{name: cm[:, i] for i, name in enumerate(classes)}},
+            use_container_width=True, hide_index=True
+        )
+
+    with col2:
+        n_bins = len(report['calibration_counts'])
+        st.caption("Calibration : précision observée par tranche de confiance")
+        st.bar_chart({
+            'Confiance': [f"{i / n_bins:.1f}–{(i + 1) / n_bins:.1f}" for i in range(n_bins)],
+            'Précision observée': report['calibration_accuracy'],
+            'Confiance moyenne': report['calibration_confidence'],
+        }, x='Confiance', stack=False, height=220)
+
+        st.caption("Seuil de confiance : couverture et précision des prédictions retenues")
+        st.line_chart({
+            'Seuil': report['thresholds'],
+            'Couverture': report['coverage'],
+            'Précision': report['threshold_accuracy'],
+        }, x='Seuil', height=220)